@@ -3,19 +3,48 @@
 Analyze the beats.json file to see what's taking up space
 """
 
-import json
+import base64
+import orjson
 import os
+import numpy as np
 
-def analyze_beats_json():
+try:
+    import simdjson  # pysimdjson: lazy DOM, fields are only decoded on access
+except ImportError:
+    simdjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+def load_beats_json(path='beats.json'):
+    """
+    Load beats.json for read-only analysis.
+
+    With pysimdjson installed the document is parsed into a lazy proxy, so the
+    base64 album art and waveform arrays are only turned into Python objects
+    when they are actually read. Without it, falls back to a full orjson parse.
+    A .msgpack path is decoded with msgpack instead (floats are read as raw
+    IEEE-754 rather than parsed from text).
+    """
+    if path.endswith('.msgpack'):
+        with open(path, 'rb') as f:
+            return msgpack.unpackb(f.read(), raw=False)
+    if simdjson is not None:
+        return simdjson.Parser().load(path)
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+def analyze_beats_json(path='beats.json'):
     """Analyze the beats.json file structure and size"""
     
     # Get file size
-    file_size = os.path.getsize('beats.json')
-    print(f"beats.json file size: {file_size / (1024*1024):.2f} MB")
+    file_size = os.path.getsize(path)
+    print(f"{path} file size: {file_size / (1024*1024):.2f} MB")
     
     # Load the data
-    with open('beats.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = load_beats_json(path)
     
     print(f"\nMetadata:")
     print(f"  Total beats: {data['metadata']['totalBeats']}")
@@ -23,6 +52,8 @@ def analyze_beats_json():
     
     # Analyze first beat
     first_beat = data['beats'][0]
+    if hasattr(first_beat, 'as_dict'):
+        first_beat = first_beat.as_dict()  # Materialize just this one beat for printing
     print(f"\nFirst beat analysis:")
     print(f"  Original filename: {first_beat['originalFileName']}")
     print(f"  New filename: {first_beat['newFileName']}")
@@ -32,15 +63,21 @@ def analyze_beats_json():
     
     # Check for album art
     if 'albumArt' in first_beat and first_beat['albumArt']:
-        album_art_size = len(first_beat['albumArt'])
-        print(f"  Album art: YES ({album_art_size:,} characters)")
-        print(f"    This is a base64 encoded image data URL")
-        print(f"    Format: data:image/jpeg;base64,<huge_string>")
+        album_art = first_beat['albumArt']
+        if album_art.startswith('data:'):
+            print(f"  Album art: YES ({len(album_art):,} characters)")
+            print(f"    This is a base64 encoded image data URL")
+            print(f"    Format: data:image/jpeg;base64,<huge_string>")
+        else:
+            print(f"  Album art: YES ({album_art})")
     else:
         print(f"  Album art: NO")
     
     # Check waveform
-    if 'waveform' in first_beat:
+    if 'waveformU8' in first_beat:
+        waveform_size = len(base64.b64decode(first_beat['waveformU8']))
+        print(f"  Waveform: {waveform_size:,} data points (base64 uint8)")
+    elif 'waveform' in first_beat:
         waveform_size = len(first_beat['waveform'])
         print(f"  Waveform: {waveform_size:,} data points")
     
@@ -50,18 +87,46 @@ def analyze_beats_json():
     print(f"    Image: {first_beat.get('imageSentimentScore', 'N/A')} ({first_beat.get('imageSentimentDisplay', 'N/A')}/10)")
     print(f"    Combined: {first_beat.get('combinedSentimentScore', 'N/A')} ({first_beat.get('combinedSentimentDisplay', 'N/A')}/10)")
     
-    # Count album art across all beats
-    beats_with_art = sum(1 for beat in data['beats'] if beat.get('albumArt'))
+    # Single pass over all beats: album art presence plus sentiment scores
+    beats = data['beats']
+    num_beats = len(beats)
+    beats_with_art = 0
+    sample_art = None
+    text_scores = np.empty(num_beats, dtype=np.float32)
+    image_scores = np.empty(num_beats, dtype=np.float32)
+    combined_scores = np.empty(num_beats, dtype=np.float32)
+    
+    for i, beat in enumerate(beats):
+        # Test the key first so beats without art never decode the field; it is only
+        # read for the null check, and kept only for the first sample printed below
+        if 'albumArt' in beat and beat['albumArt']:
+            beats_with_art += 1
+            if sample_art is None:
+                sample_art = beat['albumArt']
+        text_scores[i] = beat.get('textSentimentScore') or 0.0
+        image_scores[i] = beat.get('imageSentimentScore') or 0.0
+        combined_scores[i] = beat.get('combinedSentimentScore') or 0.0
+    
     print(f"\nAlbum art summary:")
-    print(f"  Beats with album art: {beats_with_art}/{len(data['beats'])}")
+    print(f"  Beats with album art: {beats_with_art}/{num_beats}")
     
     # Show sample of what the album art looks like
-    if beats_with_art > 0:
-        sample_beat = next(beat for beat in data['beats'] if beat.get('albumArt'))
-        album_art = sample_beat['albumArt']
-        print(f"\nSample album art data URL (first 100 chars):")
-        print(f"  {album_art[:100]}...")
-        print(f"  Total length: {len(album_art):,} characters")
+    if sample_art is not None:
+        if sample_art.startswith('data:'):
+            print(f"\nSample album art data URL (first 100 chars):")
+            print(f"  {sample_art[:100]}...")
+            print(f"  Total length: {len(sample_art):,} characters")
+        else:
+            print(f"\nSample album art path: {sample_art}")
+    
+    print(f"\nSentiment summary (mean ± std):")
+    print(f"  Text: {np.mean(text_scores):.3f} ± {np.std(text_scores):.3f}")
+    print(f"  Image: {np.mean(image_scores):.3f} ± {np.std(image_scores):.3f}")
+    print(f"  Combined: {np.mean(combined_scores):.3f} ± {np.std(combined_scores):.3f}")
 
 if __name__ == "__main__":
-    analyze_beats_json() 
\ No newline at end of file
+    # Prefer the binary sibling written by the formatters when it is usable
+    if msgpack is not None and os.path.exists('beats.msgpack'):
+        analyze_beats_json('beats.msgpack')
+    else:
+        analyze_beats_json() 
\ No newline at end of file
@@ -23,20 +23,68 @@ Requirements:
 import os
 import re
 import json
+import hashlib
+import shutil
+import threading
+import msgpack
+import orjson
 import openai
 import librosa
+from librosa.util import normalize
 import numpy as np
+import soundfile as sf
 from pathlib import Path
+from datetime import datetime, timezone
 import argparse
 from typing import Dict, List, Optional, Tuple
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Waveform points are stored as integers in 0..WAVEFORM_SCALE (divide to get 0-1)
+WAVEFORM_SCALE = 255
+
+# Completion budget for batched metadata requests: ~150 tokens per filename,
+# capped at gpt-3.5-turbo's completion limit
+TOKENS_PER_FILENAME = 150
+MAX_COMPLETION_TOKENS = 4096
+
+# Bytes from the start of each audio file hashed into its analysis cache key
+CACHE_HEAD_BYTES = 64 * 1024
+
+# Bump when the cached analysis changes meaning, so stale entries are not reused
+CACHE_VERSION = 4
+
 class BeatFormatter:
-    def __init__(self, openai_api_key: str, beats_dir: str = "beats", output_file: str = "beats.json"):
+    # Filename sanitization patterns, compiled once
+    _RE_DATE_PREFIX = re.compile(r'^\d{8}_')
+    _RE_FREE_PREFIX = re.compile(r'^\[?\(?FREE\)?\]?\s*', re.IGNORECASE)
+    _RE_SPECIAL_CHARS = re.compile(r'[^\w\s\-]')
+    _RE_SEPARATORS = re.compile(r'[\s\-]+')
+    
+    # Fallback metadata patterns
+    _RE_YEAR = re.compile(r'20\d{2}')
+    _RE_BPM = re.compile(r'(\d{2,3})BPM', re.IGNORECASE)
+    
+    # Well-formed producer names, e.g. '[FREE] J. Cole Type Beat - "Title" (Prod. XYZ) 140BPM 2023'
+    _RE_TYPE_BEAT_NAME = re.compile(
+        r'^(?:\d{8}_)?(?:\[FREE\]\s*)?(?P<artist>[\w. ]+?)\s+Type Beat\s*-\s*["“]?(?P<title>[^"”(]+?)["”]?\s*'
+        r'(?:\(Prod\.?\s*(?:by\s+)?(?P<producer>[^)]+)\))?\s*(?:(?P<bpm>\d{2,3})\s*BPM)?\s*(?P<year>20\d{2})?\s*$',
+        re.IGNORECASE
+    )
+    # Titles the fast path gets wrong: a '|' or extra ' - ' section, a bare number (usually
+    # the year), a leftover 'Prod'/'Beat'/'Instrumental' tail or a 'Free For Profit'/'FFP'
+    # tag; these go to the API instead
+    _RE_SUSPECT_TITLE = re.compile(
+        r'[|｜]|\s-\s|^\d+$|\b(?:prod|beats?|instrumental|free\s+for\s+profit|ffp)\b',
+        re.IGNORECASE
+    )
+    
+    def __init__(self, openai_api_key: str, beats_dir: str = "beats", output_file: str = "beats.json",
+                 cache_dir: Optional[str] = ".beat_cache", analysis_duration: Optional[float] = 90.0):
         """
         Initialize the BeatFormatter with OpenAI API key and configuration.
         
@@ -44,10 +92,15 @@ class BeatFormatter:
             openai_api_key: OpenAI API key for metadata extraction
             beats_dir: Directory containing beat files
             output_file: Output JSON file name
+            cache_dir: Directory for cached waveform/BPM results (None disables caching)
+            analysis_duration: Seconds of audio decoded for BPM and waveform (None decodes the full track);
+                the waveform then covers only the first analysis_duration seconds
         """
         self.beats_dir = Path(beats_dir)
         self.output_file = output_file
         self.beats_data = []
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.analysis_duration = analysis_duration
         
         # Initialize OpenAI client
         openai.api_key = openai_api_key
@@ -56,9 +109,10 @@ class BeatFormatter:
         if not self.beats_dir.exists():
             raise FileNotFoundError(f"Beats directory '{self.beats_dir}' not found")
     
-    def scan_mp3_files(self) -> List[Path]:
-        """Scan the beats directory for MP3 files."""
-        mp3_files = list(self.beats_dir.glob("*.mp3"))
+    def scan_mp3_files(self) -> List[os.DirEntry]:
+        """Scan the beats directory for MP3 files (entries carry a cached stat())."""
+        with os.scandir(self.beats_dir) as it:
+            mp3_files = [e for e in it if e.name.endswith('.mp3') and e.is_file(follow_symlinks=False)]
         logger.info(f"Found {len(mp3_files)} MP3 files in {self.beats_dir}")
         return mp3_files
     
@@ -76,22 +130,16 @@ class BeatFormatter:
         name_without_ext = Path(original_filename).stem
         
         # Remove date prefixes (YYYYMMDD_)
-        name_without_date = re.sub(r'^\d{8}_', '', name_without_ext)
+        name_cleaned = self._RE_DATE_PREFIX.sub('', name_without_ext)
         
         # Remove common prefixes like [FREE], (FREE), etc.
-        name_cleaned = re.sub(r'^\[?\(?FREE\)?\]?\s*', '', name_without_date, flags=re.IGNORECASE)
+        name_cleaned = self._RE_FREE_PREFIX.sub('', name_cleaned)
         
         # Remove special characters but keep alphanumeric, spaces, and hyphens
-        name_cleaned = re.sub(r'[^\w\s\-]', '', name_cleaned)
-        
-        # Replace multiple spaces with single space
-        name_cleaned = re.sub(r'\s+', ' ', name_cleaned)
-        
-        # Replace spaces with hyphens
-        name_cleaned = name_cleaned.replace(' ', '-')
+        name_cleaned = self._RE_SPECIAL_CHARS.sub('', name_cleaned)
         
-        # Remove multiple consecutive hyphens
-        name_cleaned = re.sub(r'-+', '-', name_cleaned)
+        # Collapse runs of whitespace and hyphens into a single hyphen
+        name_cleaned = self._RE_SEPARATORS.sub('-', name_cleaned)
         
         # Remove leading/trailing hyphens
         name_cleaned = name_cleaned.strip('-')
@@ -102,6 +150,36 @@ class BeatFormatter:
         logger.debug(f"Sanitized: '{original_filename}' -> '{sanitized_filename}'")
         return sanitized_filename
     
+    def _parse_filename_fast(self, original_filename: str) -> Optional[Dict]:
+        """
+        Parse metadata locally from filenames that follow the common type-beat pattern.
+        
+        Args:
+            original_filename: Original filename to analyze
+            
+        Returns:
+            Metadata dictionary in the same shape as the AI response, or None when
+            the filename doesn't match well enough to skip the API call
+        """
+        match = self._RE_TYPE_BEAT_NAME.match(Path(original_filename).stem)
+        if not match:
+            return None
+        
+        artist = match.group('artist').strip()
+        title = match.group('title').strip()
+        if not artist or not title or self._RE_SUSPECT_TITLE.search(title):
+            return None
+        
+        return {
+            "trackTitle": title,
+            "producer": (match.group('producer') or "").strip(),
+            "type": f"{artist} Type Beat",
+            "mood": "",
+            "genre": "Hip Hop",
+            "year": match.group('year') or "",
+            "bpm": match.group('bpm') or ""
+        }
+    
     def extract_metadata_with_ai(self, original_filename: str) -> Dict:
         """
         Use OpenAI API to extract metadata from the original filename.
@@ -112,6 +190,12 @@ class BeatFormatter:
         Returns:
             Dictionary containing extracted metadata
         """
+        # Well-formed names don't need an API round-trip
+        metadata = self._parse_filename_fast(original_filename)
+        if metadata is not None:
+            logger.debug(f"Parsed metadata locally for {original_filename}")
+            return metadata
+        
         prompt = f"""You are a music librarian. Analyze the following filename: {original_filename}
 
 Extract the following information and return a single, clean JSON object with these keys:
@@ -153,6 +237,84 @@ Use empty strings for missing fields. Return ONLY the JSON object, no additional
             logger.error(f"OpenAI API error: {e}")
             return self._fallback_metadata(original_filename)
     
+    def extract_metadata_batch(self, filenames: List[str], batch_size: int = 25) -> Dict[str, Dict]:
+        """
+        Use OpenAI API to extract metadata for many filenames, one request per batch.
+        
+        Args:
+            filenames: Original filenames to analyze
+            batch_size: Number of filenames sent in each chat completion (the default
+                keeps the token budget, TOKENS_PER_FILENAME each, under MAX_COMPLETION_TOKENS)
+            
+        Returns:
+            Dictionary mapping each filename to its metadata dictionary
+        """
+        metadata_by_name = {}
+        client = openai.OpenAI(api_key=openai.api_key)
+        
+        # Well-formed names are parsed locally; only the rest are sent to the API
+        pending = []
+        for name in filenames:
+            metadata = self._parse_filename_fast(name)
+            if metadata is not None:
+                metadata_by_name[name] = metadata
+            else:
+                pending.append(name)
+        logger.info(f"Parsed {len(metadata_by_name)} filenames locally, {len(pending)} sent to OpenAI")
+        
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            filename_list = "\n".join(f"- {name}" for name in batch)
+            prompt = f"""You are a music librarian. Analyze each of the following filenames:
+{filename_list}
+
+Return a single JSON object mapping each filename (exactly as given, without the leading "- ") to a metadata object with these keys:
+- trackTitle: The main title of the track (without quotes or special formatting)
+- producer: The producer name if mentioned
+- type: The type of beat (e.g., "J. Cole Type Beat", "Hip Hop", "Trap", etc.)
+- mood: The inferred mood/emotion of the track
+- genre: The primary genre
+- year: The year if mentioned in the filename
+- bpm: The BPM if mentioned in the filename (as integer)
+
+Use empty strings for missing fields. Return ONLY the JSON object, no additional text."""
+            
+            try:
+                response = client.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=[
+                        {"role": "system", "content": "You are a music metadata expert. Return only valid JSON."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    response_format={"type": "json_object"},
+                    temperature=0.1,
+                    max_tokens=min(MAX_COMPLETION_TOKENS, TOKENS_PER_FILENAME * len(batch))
+                )
+                
+                content = response.choices[0].message.content.strip()
+                batch_metadata = json.loads(content)
+                if not isinstance(batch_metadata, dict):
+                    raise ValueError(f"expected a JSON object, got {type(batch_metadata).__name__}")
+                
+                missing = [name for name in batch if not isinstance(batch_metadata.get(name), dict)]
+                if missing:
+                    logger.warning(f"OpenAI returned no metadata for {len(missing)} of {len(batch)} "
+                                   f"filenames in this batch; using filename parsing for those")
+                logger.debug(f"AI extracted metadata for {len(batch) - len(missing)} files")
+            except Exception as e:
+                logger.error(f"OpenAI batch metadata error: {e}")
+                batch_metadata = {}
+            
+            # Anything the model skipped or mangled falls back to filename parsing
+            for name in batch:
+                metadata = batch_metadata.get(name)
+                if isinstance(metadata, dict):
+                    metadata_by_name[name] = metadata
+                else:
+                    metadata_by_name[name] = self._fallback_metadata(name)
+        
+        return metadata_by_name
+    
     def _fallback_metadata(self, original_filename: str) -> Dict:
         """
         Fallback metadata extraction when AI fails.
@@ -164,11 +326,11 @@ Use empty strings for missing fields. Return ONLY the JSON object, no additional
             Basic metadata dictionary
         """
         # Extract year from filename
-        year_match = re.search(r'20\d{2}', original_filename)
+        year_match = self._RE_YEAR.search(original_filename)
         year = year_match.group() if year_match else ""
         
         # Extract BPM if mentioned
-        bpm_match = re.search(r'(\d{2,3})BPM', original_filename, re.IGNORECASE)
+        bpm_match = self._RE_BPM.search(original_filename)
         bpm = bpm_match.group(1) if bpm_match else ""
         
         # Basic type detection
@@ -190,78 +352,168 @@ Use empty strings for missing fields. Return ONLY the JSON object, no additional
             "bpm": bpm
         }
     
-    def generate_waveform_and_bpm(self, file_path: Path, max_points: int = 1000) -> Tuple[List[float], Optional[int]]:
+    def _audio_cache_path(self, file_path: Path, max_points: int, stat: Optional[os.stat_result] = None) -> Path:
+        """
+        Cache file for an audio analysis, keyed by content identity (size, mtime and
+        a hash of the first 64 KiB) plus CACHE_VERSION, max_points and duration. The path is left
+        out because process_all_files renames files after analyzing them; renaming
+        keeps size and mtime, so the entry is still found on the next run.
+        """
+        if stat is None:
+            stat = file_path.stat()
+        with open(file_path, 'rb') as f:
+            head_hash = hashlib.sha1(f.read(CACHE_HEAD_BYTES)).hexdigest()
+        key = f"{CACHE_VERSION}|{stat.st_size}|{stat.st_mtime_ns}|{head_hash}|{max_points}|{self.analysis_duration}"
+        return self.cache_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.msgpack"
+    
+    def _load_cached_analysis(self, cache_path: Path) -> Optional[Tuple[List[int], Optional[int]]]:
+        """Load a cached (waveform, detected_bpm) pair, or None on a miss."""
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = msgpack.unpackb(f.read(), raw=False)
+            return list(cached["waveform"]), cached["bpm"]
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable cache entry {cache_path.name}: {e}")
+            return None
+    
+    def _store_cached_analysis(self, cache_path: Path, waveform: List[int], detected_bpm: Optional[int]) -> None:
+        """Store a (waveform, detected_bpm) pair; the uint8 waveform is kept as raw bytes."""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file and swap it in, so concurrent workers never see partial entries
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(msgpack.packb({"waveform": bytes(waveform), "bpm": detected_bpm}, use_bin_type=True))
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            logger.debug(f"Could not write cache entry {cache_path.name}: {e}")
+    
+    def _load_audio(self, file_path: Path) -> Tuple[np.ndarray, int]:
+        """
+        Decode an audio file to mono float32 samples, stopping after
+        analysis_duration seconds when it is set, so decode cost scales with the window.
+        
+        Uses libsndfile through soundfile, which decodes MP3 directly (libsndfile >= 1.1),
+        and falls back to librosa.load for files or builds it can't handle.
+        
+        Args:
+            file_path: Path to the audio file
+            
+        Returns:
+            Tuple of (samples, sample_rate)
+        """
+        try:
+            with sf.SoundFile(str(file_path)) as f:
+                sr = f.samplerate
+                frames = int(self.analysis_duration * sr) if self.analysis_duration else -1
+                y = f.read(frames, dtype='float32', always_2d=False)
+            if y.ndim > 1:
+                y = y.mean(axis=1, dtype=np.float32)
+            return y, sr
+        except Exception as e:
+            logger.debug(f"soundfile could not decode {file_path.name}, using librosa.load: {e}")
+            return librosa.load(file_path, sr=None, mono=True, dtype=np.float32,
+                                duration=self.analysis_duration)
+    
+    def generate_waveform_and_bpm(self, file_path: Path, max_points: int = 1000,
+                                  stat: Optional[os.stat_result] = None) -> Tuple[List[int], Optional[int]]:
         """
         Generate waveform data and extract BPM from the audio file.
         
         Args:
             file_path: Path to the audio file
             max_points: Maximum number of points to generate
+            stat: Already-fetched stat of the file, reused for the cache key
             
         Returns:
-            Tuple of (waveform_data, detected_bpm)
+            Tuple of (waveform_data, detected_bpm); waveform points are 0-WAVEFORM_SCALE
         """
+        cache_path = None
+        if self.cache_dir is not None:
+            try:
+                cache_path = self._audio_cache_path(file_path, max_points, stat)
+            except OSError as e:
+                logger.debug(f"Not caching analysis for {file_path.name}: {e}")
+            cached = self._load_cached_analysis(cache_path) if cache_path else None
+            if cached is not None:
+                logger.debug(f"Using cached waveform and BPM for {file_path.name}")
+                return cached
+        
         try:
             # Load audio file
-            y, sr = librosa.load(file_path, sr=None, mono=True)
+            y, sr = self._load_audio(file_path)
             
-            # Extract BPM using librosa's tempo detection
-            tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
+            # Extract BPM using librosa's tempo detection. Only the tempo is used, so estimate it
+            # straight from the onset envelope (built with beat_track's median aggregate, so the
+            # BPM matches) and skip beat_track's beat-position search
+            onset_env = librosa.onset.onset_strength(y=y, sr=sr, aggregate=np.median)
+            tempo = librosa.feature.tempo(onset_envelope=onset_env, sr=sr)[0]
             detected_bpm = int(round(tempo))
             
             logger.debug(f"Detected BPM: {detected_bpm} for {file_path.name}")
             
-            # Calculate RMS energy for each frame (for waveform)
+            # Calculate RMS energy for each frame of the decoded window (for waveform)
             frame_length = int(sr * 0.1)  # 100ms frames
             hop_length = frame_length // 2
             
             rms = librosa.feature.rms(y=y, frame_length=frame_length, hop_length=hop_length)[0]
             
-            # Normalize RMS values
-            rms_normalized = rms / np.max(rms) if np.max(rms) > 0 else rms
+            # Downsample to desired number of points first, so only those get normalized
+            if len(rms) > max_points:
+                rms = rms[np.linspace(0, len(rms) - 1, max_points, dtype=int)]
             
-            # Downsample to desired number of points
-            if len(rms_normalized) > max_points:
-                indices = np.linspace(0, len(rms_normalized) - 1, max_points, dtype=int)
-                waveform = rms_normalized[indices].tolist()
-            else:
-                waveform = rms_normalized.tolist()
+            # Normalize RMS values (single pass; all-zero input is left as zeros)
+            rms_normalized = normalize(rms, norm=np.inf)
+            
+            # Quantize to 0-255 (WAVEFORM_SCALE); plenty for a pixel-height bar
+            waveform = np.clip(np.round(rms_normalized * WAVEFORM_SCALE), 0, WAVEFORM_SCALE).astype(np.uint8).tolist()
             
             logger.debug(f"Generated waveform with {len(waveform)} points for {file_path.name}")
+            
+            if cache_path is not None:
+                self._store_cached_analysis(cache_path, waveform, detected_bpm)
+            
             return waveform, detected_bpm
             
         except Exception as e:
             logger.error(f"Error processing audio for {file_path.name}: {e}")
             return [], None
     
-    def process_single_file(self, file_path: Path) -> Dict:
+    def process_single_file(self, entry: os.DirEntry, metadata: Optional[Dict] = None) -> Dict:
         """
         Process a single MP3 file: extract metadata, generate waveform, and prepare for renaming.
         
         Args:
-            file_path: Path to the MP3 file
+            entry: Directory entry of the MP3 file (from scan_mp3_files)
+            metadata: Precomputed metadata (e.g. from extract_metadata_batch);
+                fetched with a per-file AI call when omitted
             
         Returns:
             Dictionary containing all file data
         """
-        original_filename = file_path.name
+        file_path = Path(entry.path)
+        stat = entry.stat()  # Cached by scandir, no extra syscall
+        original_filename = entry.name
         logger.info(f"Processing: {original_filename}")
         
         # Step 1: Sanitize filename
         sanitized_filename = self.sanitize_filename(original_filename)
         
         # Step 2: Extract metadata using AI
-        metadata = self.extract_metadata_with_ai(original_filename)
+        if metadata is None:
+            metadata = self.extract_metadata_with_ai(original_filename)
         
         # Step 3: Generate waveform data and extract BPM
-        waveform, detected_bpm = self.generate_waveform_and_bpm(file_path)
+        waveform, detected_bpm = self.generate_waveform_and_bpm(file_path, stat=stat)
         
         # Step 4: Assemble the complete record
         beat_data = {
             "originalFileName": original_filename,
             "newFileName": sanitized_filename,
             "filePath": f"beats/{sanitized_filename}",
-            "fileSize": file_path.stat().st_size,
+            "fileSize": stat.st_size,
             "waveform": waveform,
             "detectedBpm": detected_bpm,  # Add detected BPM
             **metadata
@@ -288,13 +540,22 @@ Use empty strings for missing fields. Return ONLY the JSON object, no additional
         try:
             new_path = old_path.parent / new_filename
             
-            # Check if target file already exists
-            if new_path.exists():
+            # Hard-link then unlink: fails atomically if the target exists, where
+            # Path.rename would silently overwrite it on POSIX
+            try:
+                os.link(old_path, new_path)
+            except FileExistsError:
                 logger.warning(f"Target file {new_filename} already exists, skipping rename")
                 return False
+            except OSError:
+                # Filesystem without hard link support: check, then rename
+                if new_path.exists():
+                    logger.warning(f"Target file {new_filename} already exists, skipping rename")
+                    return False
+                old_path.rename(new_path)
+            else:
+                old_path.unlink()
             
-            # Rename the file
-            old_path.rename(new_path)
             logger.info(f"Renamed: {old_path.name} -> {new_filename}")
             return True
             
@@ -302,12 +563,14 @@ Use empty strings for missing fields. Return ONLY the JSON object, no additional
             logger.error(f"Error renaming {old_path.name}: {e}")
             return False
     
-    def process_all_files(self, dry_run: bool = False) -> None:
+    def process_all_files(self, dry_run: bool = False, max_workers: int = 8) -> None:
         """
         Process all MP3 files in the beats directory.
         
         Args:
             dry_run: If True, don't actually rename files, just generate metadata
+            max_workers: Number of files processed concurrently (OpenAI calls and
+                audio decoding mostly wait on I/O or release the GIL)
         """
         # Step 1: Scan for MP3 files
         mp3_files = self.scan_mp3_files()
@@ -316,50 +579,88 @@ Use empty strings for missing fields. Return ONLY the JSON object, no additional
             logger.warning("No MP3 files found in beats directory")
             return
         
-        # Step 2: Process each file
-        for file_path in mp3_files:
-            try:
-                # Process the file
-                beat_data = self.process_single_file(file_path)
-                
-                # Add to master list
-                self.beats_data.append(beat_data)
-                
-                # Step 3: Rename the file (unless dry run)
-                if not dry_run:
-                    success = self.rename_file(file_path, beat_data["newFileName"])
-                    if success:
-                        # Update the file path in our data
-                        beat_data["filePath"] = f"beats/{beat_data['newFileName']}"
-                
-            except Exception as e:
-                logger.error(f"Error processing {file_path.name}: {e}")
-                continue
+        # Step 2: Extract metadata for all files in batched AI requests
+        metadata_by_name = self.extract_metadata_batch([e.name for e in mp3_files])
         
-        # Step 4: Save the JSON output
+        # Step 3: Process files in parallel
+        results = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {
+                pool.submit(self.process_single_file, e, metadata_by_name.get(e.name)): e
+                for e in mp3_files
+            }
+            for future in as_completed(futures):
+                entry = futures[future]
+                try:
+                    results[entry.name] = future.result()
+                except Exception as e:
+                    logger.error(f"Error processing {entry.name}: {e}")
+        
+        # Step 4: Collect in scan order and rename serially to avoid rename races
+        for entry in mp3_files:
+            beat_data = results.get(entry.name)
+            if beat_data is None:
+                continue
+            
+            # Add to master list
+            self.beats_data.append(beat_data)
+            
+            # Rename the file (unless dry run)
+            if not dry_run:
+                success = self.rename_file(Path(entry.path), beat_data["newFileName"])
+                if success:
+                    # Update the file path in our data
+                    beat_data["filePath"] = f"beats/{beat_data['newFileName']}"
+        
+        # Step 5: Save the JSON output
         self.save_beats_json()
         
         logger.info(f"Processing complete. Processed {len(self.beats_data)} files.")
     
     def save_beats_json(self) -> None:
-        """Save the beats data to JSON file."""
+        """Save the beats data to the JSON file and its MessagePack sibling."""
         try:
-            output_data = {
-                "metadata": {
-                    "totalBeats": len(self.beats_data),
-                    "generatedAt": str(np.datetime64('now')),
-                    "version": "1.0"
-                },
-                "beats": self.beats_data
+            metadata = {
+                "totalBeats": len(self.beats_data),
+                "generatedAt": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                "version": "1.0",
+                "waveformScale": WAVEFORM_SCALE
             }
             
-            with open(self.output_file, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, indent=2, ensure_ascii=False)
+            # Write one beat record at a time so only a single record's bytes are buffered;
+            # OPT_SERIALIZE_NUMPY covers any numpy value left over from the audio analysis
+            with open(self.output_file, 'wb') as f:
+                f.write(b'{\n  "metadata": ')
+                f.write(orjson.dumps(metadata))
+                f.write(b',\n  "beats": [')
+                for i, beat in enumerate(self.beats_data):
+                    f.write(b',\n    ' if i else b'\n    ')
+                    f.write(orjson.dumps(beat, option=orjson.OPT_SERIALIZE_NUMPY))
+                f.write(b'\n  ]\n}\n')
             
             logger.info(f"Saved beats data to {self.output_file}")
             
         except Exception as e:
             logger.error(f"Error saving JSON file: {e}")
+            return
+        
+        try:
+            # Binary sibling: floats are stored as raw IEEE-754 instead of text
+            msgpack_file = Path(self.output_file).with_suffix('.msgpack')
+            packer = msgpack.Packer(use_bin_type=True)
+            with open(msgpack_file, 'wb') as f:
+                f.write(packer.pack_map_header(2))
+                f.write(packer.pack("metadata"))
+                f.write(packer.pack(metadata))
+                f.write(packer.pack("beats"))
+                f.write(packer.pack_array_header(len(self.beats_data)))
+                for beat in self.beats_data:
+                    f.write(packer.pack(beat))
+            
+            logger.info(f"Saved beats data to {msgpack_file}")
+            
+        except Exception as e:
+            logger.error(f"Error saving MessagePack file: {e}")
     
     def update_beat_manager(self) -> None:
         """
@@ -376,19 +677,23 @@ Use empty strings for missing fields. Return ONLY the JSON object, no additional
                 })
             
             # Generate the JavaScript code
-            js_code = f"""// Auto-generated playlist from format_beats.py
-// Generated on: {np.datetime64('now')}
+            js_header = f"""// Auto-generated playlist from format_beats.py
+// Generated on: {datetime.now(timezone.utc).isoformat(timespec='seconds')}
 // Total beats: {len(self.beats_data)}
 
-export const BEAT_PLAYLIST = {json.dumps(playlist_entries, indent=4)};
-
-// Individual beat metadata for advanced features
-export const BEAT_METADATA = {json.dumps(self.beats_data, indent=4)};
 """
             
             # Save to a new file
-            with open("js/generated_playlist.js", 'w', encoding='utf-8') as f:
-                f.write(js_code)
+            with open("js/generated_playlist.js", 'wb') as f:
+                f.write(js_header.encode('utf-8'))
+                f.write(b'export const BEAT_PLAYLIST = ')
+                f.write(orjson.dumps(playlist_entries, option=orjson.OPT_INDENT_2))
+                f.write(b';\n\n// Individual beat metadata for advanced features\n')
+                f.write(b'const BEAT_DATA = ')
+                # Copy the beats.json save_beats_json already wrote instead of re-encoding the catalog
+                with open(self.output_file, 'rb') as beats_json:
+                    shutil.copyfileobj(beats_json, f)
+                f.write(b';\n\nexport const BEAT_METADATA = BEAT_DATA.beats;\n')
             
             logger.info("Generated js/generated_playlist.js for integration with beatManager.js")
             
@@ -403,6 +708,11 @@ def main():
     parser.add_argument("--output", default="beats.json", help="Output JSON file")
     parser.add_argument("--dry-run", action="store_true", help="Don't rename files, just generate metadata")
     parser.add_argument("--update-beat-manager", action="store_true", help="Generate JavaScript playlist file")
+    parser.add_argument("--workers", type=int, default=8, help="Number of files to process concurrently")
+    parser.add_argument("--cache-dir", default=".beat_cache", help="Directory for cached waveform/BPM results")
+    parser.add_argument("--no-cache", action="store_true", help="Re-analyze all audio, ignoring the cache")
+    parser.add_argument("--analysis-duration", type=float, default=90.0, help="Seconds of audio decoded for BPM and waveform; the waveform covers only this window")
+    parser.add_argument("--full-track", action="store_true", help="Decode and analyze the full track instead of the first --analysis-duration seconds")
     
     args = parser.parse_args()
     
@@ -411,11 +721,13 @@ def main():
         formatter = BeatFormatter(
             openai_api_key=args.openai_key,
             beats_dir=args.beats_dir,
-            output_file=args.output
+            output_file=args.output,
+            cache_dir=None if args.no_cache else args.cache_dir,
+            analysis_duration=None if args.full_track else args.analysis_duration
         )
         
         # Process all files
-        formatter.process_all_files(dry_run=args.dry_run)
+        formatter.process_all_files(dry_run=args.dry_run, max_workers=args.workers)
         
         # Update beat manager if requested
         if args.update_beat_manager:
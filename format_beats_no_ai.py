@@ -15,39 +15,254 @@ Features:
 
 import os
 import re
-import json
+import msgpack
+import orjson
 import librosa
+from librosa.util import normalize
 import numpy as np
+from numba import njit
 from pathlib import Path
+from datetime import datetime, timezone
 import argparse
 from typing import Dict, List, Optional, Tuple
 import logging
+import functools
+import bisect
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import base64
+import hashlib
+import mimetypes
 from mutagen import File
 from mutagen.id3 import ID3
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 from PIL import Image
 import io
 
+try:
+    import simplejpeg  # libjpeg-turbo bindings: decode JPEG straight to an RGB numpy array
+except ImportError:
+    simplejpeg = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Waveform points are stored as integers in 0..WAVEFORM_SCALE (divide to get 0-1)
+WAVEFORM_SCALE = 255
+
+# Bumped when the beat record format changes, invalidating cached records
+CACHE_VERSION = 4
+
+# Sample rate audio is decoded at for BPM and waveform analysis
+ANALYSIS_SAMPLE_RATE = 11025
+
+# FFT size of the spectrogram shared by tempo detection and the RMS envelope
+STFT_SIZE = 2048
+
+# Hop of that spectrogram: ~23 ms at ANALYSIS_SAMPLE_RATE, the same frame rate as
+# librosa's default (512 at 22050 Hz). Tempo resolution depends on this hop, so
+# the coarser waveform hop must not be used for beat tracking.
+TEMPO_HOP_LENGTH = 256
+
+# Filename patterns, compiled once
+_RE_DATE = re.compile(r'^\d{8}_')
+_RE_FREE = re.compile(r'^\[?\(?FREE\)?\]?\s*', re.IGNORECASE)
+_RE_NONWORD = re.compile(r'[^\w\s\-]')
+_RE_SEPARATORS = re.compile(r'[\s\-]+')
+_RE_YEAR = re.compile(r'20\d{2}')
+_RE_BPM = re.compile(r'(\d{2,3})BPM', re.IGNORECASE)
+_RE_QUOTED_TITLE = re.compile(r'["""]([^"""]+)["""]')
+_RE_PRODUCER = re.compile(r'\(?Prod\.?\s*([^)]+)\)?', re.IGNORECASE)
+_RE_TYPE_BEAT = re.compile(r'([A-Z][a-z\.\s]+(?:\s+x\s+[A-Z][a-z\.\s]+)*)\s+type\s+beat', re.IGNORECASE)
+
+# BPM mood ranges: a BPM up to and including _MOOD_THRESHOLDS[i] maps to _MOOD_LABELS[i]
+_MOOD_THRESHOLDS = (69, 95, 125)
+_MOOD_LABELS = ("Chill", "R&B", "Boom Bap", "Trap")
+
+# Fallback type keywords, checked in order against the lowercased filename
+_GENRE_KEYWORDS = (
+    ("Instrumental", "instrumental"),
+    ("Hip Hop", "hip hop"),
+    ("Trap", "trap"),
+    ("Boom Bap", "boom bap"),
+    ("Lo-Fi", "lofi"),
+)
+
+# Emotional keywords used to break ties when VADER is neutral (substring matches)
+_POSITIVE_KEYWORDS = frozenset(['hope', 'love', 'dream', 'heaven', 'peaceful', 'gentle', 'happy', 'joy', 'light', 'sun', 'morning', 'feelings'])
+_NEGATIVE_KEYWORDS = frozenset(['sad', 'alone', 'dark', 'hell', 'angry', 'violent', 'hate', 'aggressive', 'hard', 'rough', 'night', 'evil', 'sinister', 'devious'])
+
+@functools.lru_cache(maxsize=1)
+def _get_vader() -> SentimentIntensityAnalyzer:
+    """VADER analyzer shared by every formatter in this process; the lexicon loads on first use."""
+    return SentimentIntensityAnalyzer()
+
+@njit(cache=True)
+def _sentiment_display(sentiment_score: float) -> int:
+    """Map a -1..1 sentiment score to the 1-10 display scale."""
+    # Convert to 1-10 scale with more decisive distribution
+    # Instead of linear mapping, use a more aggressive curve
+    if sentiment_score >= 0.5:
+        sentiment_display = int(round(8 + (sentiment_score - 0.5) * 4))  # 8-10 range
+    elif sentiment_score >= 0.1:
+        sentiment_display = int(round(6 + (sentiment_score - 0.1) * 5))  # 6-7 range
+    elif sentiment_score >= -0.1:
+        sentiment_display = 5  # Neutral
+    elif sentiment_score >= -0.5:
+        sentiment_display = int(round(3 + (sentiment_score + 0.5) * 5))  # 3-4 range
+    else:
+        sentiment_display = int(round(1 + (sentiment_score + 1) * 2))  # 1-2 range
+    
+    # Ensure bounds
+    return max(1, min(10, sentiment_display))
+
+@njit(cache=True)
+def _finalize_sentiment(compound: float, positive_count: int, negative_count: int) -> Tuple[float, int]:
+    """
+    Make a VADER compound score more decisive and map it to the display scale.
+    
+    Args:
+        compound: VADER compound score (-1 to 1)
+        positive_count: Positive keywords found in the filename
+        negative_count: Negative keywords found in the filename
+        
+    Returns:
+        Tuple of (sentiment_score, sentiment_display)
+    """
+    sentiment_score = compound
+    
+    # Make VADER more decisive by adjusting thresholds and adding bias
+    # Instead of neutral 5/10 being the default, push toward stronger classifications
+    if abs(sentiment_score) < 0.1:  # Very neutral scores
+        if positive_count > negative_count:
+            sentiment_score = 0.3  # Push toward positive
+        elif negative_count > positive_count:
+            sentiment_score = -0.3  # Push toward negative
+        # If equal, keep neutral but with slight bias toward negative (more common in hip hop)
+        else:
+            sentiment_score = -0.1
+    
+    # Apply additional bias for stronger classifications
+    # Make the scale more aggressive - push scores toward extremes
+    if sentiment_score > 0.2:
+        sentiment_score = min(1.0, sentiment_score * 1.3)  # Amplify positive
+    elif sentiment_score < -0.2:
+        sentiment_score = max(-1.0, sentiment_score * 1.3)  # Amplify negative
+    
+    return sentiment_score, _sentiment_display(sentiment_score)
+
+@njit(cache=True)
+def _pixel_sums(pixels: np.ndarray) -> Tuple[int, int, int, int, int]:
+    """
+    One pass over (N, 3) uint8 pixels with integer accumulators.
+    
+    Returns:
+        Tuple of (sum, sum of squares, red sum, blue sum, sum of |3 * value - pixel sum|)
+    """
+    total = 0
+    sum_sq = 0
+    red_sum = 0
+    blue_sum = 0
+    deviation_sum = 0
+    for i in range(pixels.shape[0]):
+        r = np.int64(pixels[i, 0])
+        g = np.int64(pixels[i, 1])
+        b = np.int64(pixels[i, 2])
+        pixel_sum = r + g + b
+        total += pixel_sum
+        sum_sq += r * r + g * g + b * b
+        red_sum += r
+        blue_sum += b
+        deviation_sum += abs(3 * r - pixel_sum) + abs(3 * g - pixel_sum) + abs(3 * b - pixel_sum)
+    return total, sum_sq, red_sum, blue_sum, deviation_sum
+
+def _image_stats(img_array: np.ndarray) -> Tuple[float, float, float, float]:
+    """
+    Brightness, color temperature, contrast and saturation of an RGB uint8 image.
+    
+    Everything comes from exact integer sums gathered in a single compiled pass
+    over the pixels (see _pixel_sums), with no temporary copies of the image.
+    
+    Returns:
+        Tuple of (brightness, color_temp, contrast, saturation)
+    """
+    pixels = np.ascontiguousarray(img_array).reshape(-1, 3)
+    n = pixels.shape[0]
+    total, sum_sq, red_sum, blue_sum, deviation_sum = _pixel_sums(pixels)
+    
+    # Average brightness (0-255) and red vs blue dominance
+    brightness = total / (3 * n)
+    color_temp = (red_sum - blue_sum) / n  # Positive = warm, negative = cool
+    
+    # Contrast: standard deviation of all values, from exact integer moments
+    contrast = float(np.sqrt((3 * n * sum_sq - total * total) / (3 * n) ** 2))
+    
+    # Saturation: mean |value - pixel gray|, kept integral as |3 * value - pixel sum| / 3
+    saturation = deviation_sum / (9 * n)
+    
+    return brightness, color_temp, contrast, saturation
+
+def _block_means(values: np.ndarray, n_points: int) -> np.ndarray:
+    """
+    Average values into n_points consecutive, near-equal blocks covering the whole array.
+    
+    Block edges come from linspace, so every frame contributes (nothing is trimmed
+    from the end) and the result still spans the full timeline. Requires
+    n_points <= len(values).
+    """
+    edges = np.linspace(0, len(values), n_points + 1).astype(np.intp)
+    return np.add.reduceat(values, edges[:-1]) / np.diff(edges)
+
+def _decode_thumbnail(image_data: bytes, size: int = 100) -> np.ndarray:
+    """
+    Decode image bytes to a size x size RGB uint8 array.
+    
+    JPEGs go through simplejpeg when it is installed, otherwise through Pillow;
+    either way the decoder scales down by 1/2, 1/4 or 1/8 (DCT scaling) so large
+    album art is never fully decoded before the final resize.
+    """
+    image = None
+    if simplejpeg is not None and image_data[:2] == b'\xff\xd8':
+        try:
+            image = Image.fromarray(simplejpeg.decode_jpeg(
+                image_data, colorspace='RGB', min_height=size, min_width=size
+            ))
+        except ValueError:
+            image = None  # e.g. CMYK JPEGs; let Pillow handle them
+    
+    if image is None:
+        image = Image.open(io.BytesIO(image_data))
+        image.draft('RGB', (size, size))
+        
+        # Convert to RGB if necessary
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+    
+    return np.asarray(image.resize((size, size)))
+
 class BeatFormatterNoAI:
-    def __init__(self, beats_dir: str = "beats", output_file: str = "beats.json"):
+    def __init__(self, beats_dir: str = "beats", output_file: str = "beats.json",
+                 inline_album_art: bool = False, cache_file: Optional[str] = ".beat_cache.json"):
         """
         Initialize the BeatFormatter without AI dependencies.
         
         Args:
             beats_dir: Directory containing beat files
             output_file: Output JSON file name
+            inline_album_art: Embed album art as base64 data URLs instead of
+                writing it to image files under beats/art/
+            cache_file: JSON file of per-file results reused while a file's size
+                and mtime are unchanged (None disables caching)
         """
         self.beats_dir = Path(beats_dir)
         self.output_file = output_file
         self.beats_data = []
+        self.inline_album_art = inline_album_art
+        self.art_dir = self.beats_dir / "art"
+        self.cache_file = Path(cache_file) if cache_file else None
         
-        # Initialize VADER sentiment analyzer
-        self.sentiment_analyzer = SentimentIntensityAnalyzer()
+        # Shared by beats.json metadata and the generated playlist (refreshed per run)
+        self.generated_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
         
         # Ensure beats directory exists
         if not self.beats_dir.exists():
@@ -73,22 +288,16 @@ class BeatFormatterNoAI:
         name_without_ext = Path(original_filename).stem
         
         # Remove date prefixes (YYYYMMDD_)
-        name_without_date = re.sub(r'^\d{8}_', '', name_without_ext)
+        name_cleaned = _RE_DATE.sub('', name_without_ext)
         
         # Remove common prefixes like [FREE], (FREE), etc.
-        name_cleaned = re.sub(r'^\[?\(?FREE\)?\]?\s*', '', name_without_date, flags=re.IGNORECASE)
+        name_cleaned = _RE_FREE.sub('', name_cleaned)
         
         # Remove special characters but keep alphanumeric, spaces, and hyphens
-        name_cleaned = re.sub(r'[^\w\s\-]', '', name_cleaned)
+        name_cleaned = _RE_NONWORD.sub('', name_cleaned)
         
-        # Replace multiple spaces with single space
-        name_cleaned = re.sub(r'\s+', ' ', name_cleaned)
-        
-        # Replace spaces with hyphens
-        name_cleaned = name_cleaned.replace(' ', '-')
-        
-        # Remove multiple consecutive hyphens
-        name_cleaned = re.sub(r'-+', '-', name_cleaned)
+        # Collapse runs of whitespace and hyphens into a single hyphen
+        name_cleaned = _RE_SEPARATORS.sub('-', name_cleaned)
         
         # Remove leading/trailing hyphens
         name_cleaned = name_cleaned.strip('-')
@@ -110,108 +319,60 @@ class BeatFormatterNoAI:
             Dictionary containing extracted metadata
         """
         # Extract year from filename
-        year_match = re.search(r'20\d{2}', original_filename)
+        year_match = _RE_YEAR.search(original_filename)
         year = year_match.group() if year_match else ""
         
         # Extract BPM if mentioned
-        bpm_match = re.search(r'(\d{2,3})BPM', original_filename, re.IGNORECASE)
+        bpm_match = _RE_BPM.search(original_filename)
         bpm = bpm_match.group(1) if bpm_match else ""
         
         # Extract track title (try to find text in quotes)
-        title_match = re.search(r'["""]([^"""]+)["""]', original_filename)
+        title_match = _RE_QUOTED_TITLE.search(original_filename)
         track_title = title_match.group(1) if title_match else ""
         
         # Extract producer (look for "Prod." or "Prod")
-        producer_match = re.search(r'\(?Prod\.?\s*([^)]+)\)?', original_filename, re.IGNORECASE)
+        producer_match = _RE_PRODUCER.search(original_filename)
         producer = producer_match.group(1).strip() if producer_match else ""
         
         # Enhanced type beat and artist detection
         type_beat = ""
         artists = []
         
-        # Look for "type beat" patterns
-        type_beat_patterns = [
-            r'([A-Z][a-z\.\s]+(?:\s+x\s+[A-Z][a-z\.\s]+)*)\s+type\s+beat',
-            r'([A-Z][a-z\.\s]+(?:\s+x\s+[A-Z][a-z\.\s]+)*)\s+Type\s+Beat',
-            r'([A-Z][a-z\.\s]+(?:\s+x\s+[A-Z][a-z\.\s]+)*)\s+TYPE\s+BEAT'
-        ]
-        
-        for pattern in type_beat_patterns:
-            matches = re.findall(pattern, original_filename, re.IGNORECASE)
-            if matches:
-                # Extract artists from the match
-                artist_text = matches[0].strip()
-                # Split by 'x' to get individual artists
-                if ' x ' in artist_text:
-                    artists = [artist.strip() for artist in artist_text.split(' x ')]
-                else:
-                    artists = [artist_text]
-                type_beat = f"{artist_text} Type Beat"
-                break
+        # Look for "type beat" patterns (one case-insensitive pattern covers all casings)
+        type_beat_match = _RE_TYPE_BEAT.search(original_filename)
+        if type_beat_match:
+            # Extract artists from the match
+            artist_text = type_beat_match.group(1).strip()
+            # Split by 'x' to get individual artists
+            if ' x ' in artist_text:
+                artists = [artist.strip() for artist in artist_text.split(' x ')]
+            else:
+                artists = [artist_text]
+            type_beat = f"{artist_text} Type Beat"
+        
+        filename_lower = original_filename.lower()
         
         # Fallback type detection if no artist type beat found
         if not type_beat:
-            if "instrumental" in original_filename.lower():
-                type_beat = "Instrumental"
-            elif "hip hop" in original_filename.lower():
-                type_beat = "Hip Hop"
-            elif "trap" in original_filename.lower():
-                type_beat = "Trap"
-            elif "boom bap" in original_filename.lower():
-                type_beat = "Boom Bap"
-            elif "lofi" in original_filename.lower():
-                type_beat = "Lo-Fi"
+            for label, keyword in _GENRE_KEYWORDS:
+                if keyword in filename_lower:
+                    type_beat = label
+                    break
         
         # BPM-based mood detection (will be updated after BPM detection)
         mood = ""  # Will be set based on detected BPM
         
         # Analyze sentiment of the filename
-        sentiment_scores = self.sentiment_analyzer.polarity_scores(original_filename)
+        sentiment_scores = _get_vader().polarity_scores(original_filename)
         sentiment_score = sentiment_scores['compound']  # -1 to 1
         
-        # Make VADER more decisive by adjusting thresholds and adding bias
-        # Instead of neutral 5/10 being the default, push toward stronger classifications
-        if abs(sentiment_score) < 0.1:  # Very neutral scores
-            # Look for emotional keywords to push toward stronger classification
-            emotional_keywords = {
-                'positive': ['hope', 'love', 'dream', 'heaven', 'peaceful', 'gentle', 'happy', 'joy', 'light', 'sun', 'morning', 'feelings'],
-                'negative': ['sad', 'alone', 'dark', 'hell', 'angry', 'violent', 'hate', 'aggressive', 'hard', 'rough', 'night', 'evil', 'sinister', 'devious']
-            }
-            
-            filename_lower = original_filename.lower()
-            positive_count = sum(1 for word in emotional_keywords['positive'] if word in filename_lower)
-            negative_count = sum(1 for word in emotional_keywords['negative'] if word in filename_lower)
-            
-            if positive_count > negative_count:
-                sentiment_score = 0.3  # Push toward positive
-            elif negative_count > positive_count:
-                sentiment_score = -0.3  # Push toward negative
-            # If equal, keep neutral but with slight bias toward negative (more common in hip hop)
-            else:
-                sentiment_score = -0.1
-        
-        # Apply additional bias for stronger classifications
-        # Make the scale more aggressive - push scores toward extremes
-        if sentiment_score > 0.2:
-            sentiment_score = min(1.0, sentiment_score * 1.3)  # Amplify positive
-        elif sentiment_score < -0.2:
-            sentiment_score = max(-1.0, sentiment_score * 1.3)  # Amplify negative
-        
-        # Convert to 1-10 scale with more decisive distribution
-        # Instead of linear mapping, use a more aggressive curve
-        if sentiment_score >= 0.5:
-            sentiment_display = int(round(8 + (sentiment_score - 0.5) * 4))  # 8-10 range
-        elif sentiment_score >= 0.1:
-            sentiment_display = int(round(6 + (sentiment_score - 0.1) * 5))  # 6-7 range
-        elif sentiment_score >= -0.1:
-            sentiment_display = 5  # Neutral
-        elif sentiment_score >= -0.5:
-            sentiment_display = int(round(3 + (sentiment_score + 0.5) * 5))  # 3-4 range
-        else:
-            sentiment_display = int(round(1 + (sentiment_score + 1) * 2))  # 1-2 range
+        # Look for emotional keywords to break ties on very neutral scores
+        positive_count = negative_count = 0
+        if abs(sentiment_score) < 0.1:
+            positive_count = sum(1 for word in _POSITIVE_KEYWORDS if word in filename_lower)
+            negative_count = sum(1 for word in _NEGATIVE_KEYWORDS if word in filename_lower)
         
-        # Ensure bounds
-        sentiment_display = max(1, min(10, sentiment_display))
+        sentiment_score, sentiment_display = _finalize_sentiment(sentiment_score, positive_count, negative_count)
         
         return {
             "trackTitle": track_title,
@@ -228,50 +389,81 @@ class BeatFormatterNoAI:
             "textSentimentDisplay": sentiment_display  # Keep original text-only display
         }
     
-    def generate_waveform_and_bpm(self, file_path: Path, max_points: int = 1000) -> Tuple[List[float], Optional[float], Optional[int]]:
+    def generate_waveform_and_bpm(self, file_path: Path, max_points: int = 1000,
+                                  skip_bpm: bool = False) -> Tuple[str, Optional[float], Optional[int]]:
         """
         Generate waveform data and extract BPM from the audio file.
         
         Args:
             file_path: Path to the audio file
             max_points: Maximum number of points to generate
+            skip_bpm: Only build the waveform; BPMs are returned as None
             
         Returns:
-            Tuple of (waveform_data, detected_bpm)
+            Tuple of (waveform_data, detected_bpm); waveform_data is base64 of uint8 points (0-WAVEFORM_SCALE)
         """
         try:
-            # Load audio file
-            y, sr = librosa.load(file_path, sr=None, mono=True)
-            
-            # Extract BPM using librosa's tempo detection
-            tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
-            detected_bpm_exact = float(tempo)  # Keep exact decimal precision
-            detected_bpm_display = int(round(detected_bpm_exact))  # Proper rounding for display
+            # Load audio file as mono at ANALYSIS_SAMPLE_RATE; tempo and a 1000-point
+            # envelope don't need the full 44.1/48 kHz, and every later pass gets ~4x cheaper
+            y, sr = librosa.load(file_path, sr=ANALYSIS_SAMPLE_RATE, mono=True, res_type='soxr_lq')
             
-            logger.debug(f"Detected BPM: {detected_bpm_exact:.2f} (display: {detected_bpm_display}) for {file_path.name}")
-            
-            # Calculate RMS energy for each frame (for waveform)
+            # RMS frames (for waveform)
             frame_length = int(sr * 0.1)  # 100ms frames
             hop_length = frame_length // 2
             
-            rms = librosa.feature.rms(y=y, frame_length=frame_length, hop_length=hop_length)[0]
+            detected_bpm_exact = detected_bpm_display = None
+            if skip_bpm:
+                # Waveform only: time-domain RMS is cheaper than an STFT
+                rms = librosa.feature.rms(y=y, frame_length=frame_length, hop_length=hop_length)[0]
+            else:
+                # One STFT at the fine tempo hop, shared by tempo detection and the RMS envelope
+                mag = np.abs(librosa.stft(y, n_fft=STFT_SIZE, hop_length=TEMPO_HOP_LENGTH))
+                rms = librosa.feature.rms(S=mag, frame_length=STFT_SIZE, hop_length=TEMPO_HOP_LENGTH)[0]
+                
+                # Average the fine RMS frames down to the waveform's 50 ms hop, so the
+                # waveform has the same resolution as the time-domain path above
+                waveform_frames = 1 + len(y) // hop_length
+                if len(rms) > waveform_frames:
+                    rms = _block_means(rms, waveform_frames)
+                
+                # beat_track can silently return 0 on very quiet audio (common with lo-fi),
+                # so boost low-level signals for tempo detection only; the waveform keeps y
+                signal_rms = np.sqrt(np.mean(y * y))
+                gain = (0.1 / (signal_rms + 1e-9)) ** 0.5 if signal_rms < 0.05 else 1.0
+                
+                # Same onset envelope beat_track builds internally (log-power mel, median
+                # aggregate, same hop), from the shared STFT
+                mel = librosa.feature.melspectrogram(S=(mag * gain) ** 2, sr=sr)
+                onset_env = librosa.onset.onset_strength(S=librosa.power_to_db(mel), sr=sr,
+                                                         hop_length=TEMPO_HOP_LENGTH, aggregate=np.median)
+                
+                # Extract BPM using librosa's tempo detection
+                tempo, _ = librosa.beat.beat_track(onset_envelope=onset_env, sr=sr, hop_length=TEMPO_HOP_LENGTH)
+                detected_bpm_exact = float(tempo)  # Keep exact decimal precision
+                detected_bpm_display = int(round(detected_bpm_exact))  # Proper rounding for display
+                
+                logger.debug(f"Detected BPM: {detected_bpm_exact:.2f} (display: {detected_bpm_display}) for {file_path.name}")
             
-            # Normalize RMS values
-            rms_normalized = rms / np.max(rms) if np.max(rms) > 0 else rms
+            # Downsample to desired number of points first (mean of each block, so every
+            # frame's energy counts), so only those get normalized
+            if len(rms) > max_points:
+                rms = _block_means(rms, max_points)
             
-            # Downsample to desired number of points
-            if len(rms_normalized) > max_points:
-                indices = np.linspace(0, len(rms_normalized) - 1, max_points, dtype=int)
-                waveform = rms_normalized[indices].tolist()
-            else:
-                waveform = rms_normalized.tolist()
+            # Normalize RMS values (single pass; all-zero input is left as zeros)
+            rms_normalized = normalize(rms, norm=np.inf)
+            
+            # Quantize to 0-255 (WAVEFORM_SCALE); plenty for a pixel-height bar
+            waveform_u8 = np.clip(np.round(rms_normalized * WAVEFORM_SCALE), 0, WAVEFORM_SCALE).astype(np.uint8)
+            
+            # One byte per point, base64-encoded (decode with atob + Uint8Array in JS)
+            waveform = base64.b64encode(waveform_u8.tobytes()).decode('ascii')
             
-            logger.debug(f"Generated waveform with {len(waveform)} points for {file_path.name}")
+            logger.debug(f"Generated waveform with {len(waveform_u8)} points for {file_path.name}")
             return waveform, detected_bpm_exact, detected_bpm_display
             
         except Exception as e:
             logger.error(f"Error processing audio for {file_path.name}: {e}")
-            return [], None, None
+            return "", None, None
     
     def process_single_file(self, file_path: Path) -> Dict:
         """
@@ -292,18 +484,32 @@ class BeatFormatterNoAI:
         # Step 2: Extract metadata from filename
         metadata = self.extract_metadata_from_filename(original_filename)
         
-        # Step 3: Generate waveform data and extract BPM
-        waveform, detected_bpm_exact, detected_bpm_display = self.generate_waveform_and_bpm(file_path)
+        # Step 3: Generate waveform data and extract BPM; a BPM tagged in the
+        # filename is trusted, which skips tempo detection (the slowest step)
+        filename_bpm = metadata.get("bpm")
+        waveform, detected_bpm_exact, detected_bpm_display = self.generate_waveform_and_bpm(
+            file_path, skip_bpm=bool(filename_bpm)
+        )
+        if filename_bpm:
+            detected_bpm_exact = float(filename_bpm)
+            detected_bpm_display = int(filename_bpm)
         
         # Step 4: Extract album art
-        album_art = self.extract_album_art(file_path)
+        album_art = None
+        art = self.extract_album_art(file_path)
         
         # Step 5: Analyze image sentiment if album art exists
         image_sentiment_score = 0.0
         image_sentiment_display = 5
-        if album_art:
-            image_sentiment_score, image_sentiment_display = self.analyze_image_sentiment(album_art)
+        if art:
+            image_data, mime_type = art
+            image_sentiment_score, image_sentiment_display = self.analyze_image_sentiment(image_data)
             logger.debug(f"Image sentiment for {original_filename}: {image_sentiment_score:.3f} ({image_sentiment_display}/10)")
+            
+            if self.inline_album_art:
+                album_art = self.album_art_data_url(image_data, mime_type)
+            else:
+                album_art = self.save_album_art(image_data, mime_type)
         
         # Step 6: Combine text and image sentiment
         # Weight: 70% text, 30% image (text is more reliable for beat titles)
@@ -313,18 +519,7 @@ class BeatFormatterNoAI:
         )
         
         # Convert combined score to display scale
-        if combined_sentiment_score >= 0.5:
-            combined_display = int(round(8 + (combined_sentiment_score - 0.5) * 4))
-        elif combined_sentiment_score >= 0.1:
-            combined_display = int(round(6 + (combined_sentiment_score - 0.1) * 5))
-        elif combined_sentiment_score >= -0.1:
-            combined_display = 5
-        elif combined_sentiment_score >= -0.5:
-            combined_display = int(round(3 + (combined_sentiment_score + 0.5) * 5))
-        else:
-            combined_display = int(round(1 + (combined_sentiment_score + 1) * 2))
-        
-        combined_display = max(1, min(10, combined_display))
+        combined_display = _sentiment_display(combined_sentiment_score)
         
         # Step 7: Assemble the complete record
         beat_data = {
@@ -332,10 +527,10 @@ class BeatFormatterNoAI:
             "newFileName": sanitized_filename,
             "filePath": f"beats/{sanitized_filename}",
             "fileSize": file_path.stat().st_size,
-            "waveform": waveform,
+            "waveformU8": waveform,  # Base64 uint8 points (0-255)
             "detectedBpmExact": detected_bpm_exact,  # Exact BPM for beat tracker
             "detectedBpmDisplay": detected_bpm_display,  # Rounded BPM for display
-            "albumArt": album_art,  # Add album art as base64 data URL
+            "albumArt": album_art,  # Album art image path (or base64 data URL if inlined)
             "imageSentimentScore": image_sentiment_score,  # Image-only sentiment
             "imageSentimentDisplay": image_sentiment_display,  # Image-only display
             "combinedSentimentScore": combined_sentiment_score,  # Combined text+image
@@ -356,50 +551,23 @@ class BeatFormatterNoAI:
         
         return beat_data
     
-    def analyze_image_sentiment(self, image_data_url: str) -> Tuple[float, int]:
+    def analyze_image_sentiment(self, image_data: bytes) -> Tuple[float, int]:
         """
         Analyze image sentiment based on brightness and color characteristics.
         
         Args:
-            image_data_url: Base64 data URL of the image
+            image_data: Raw image bytes (e.g. embedded JPEG album art)
             
         Returns:
             Tuple of (sentiment_score, sentiment_display)
         """
         try:
-            # Extract base64 data from data URL
-            if image_data_url.startswith('data:'):
-                # Remove data URL prefix
-                base64_data = image_data_url.split(',')[1]
-                image_data = base64.b64decode(base64_data)
-                
-                # Open image with PIL
-                image = Image.open(io.BytesIO(image_data))
-                
-                # Convert to RGB if necessary
-                if image.mode != 'RGB':
-                    image = image.convert('RGB')
+            if image_data:
+                # Decode and resize for faster processing
+                img_array = _decode_thumbnail(image_data)
                 
-                # Resize for faster processing
-                image = image.resize((100, 100))
-                
-                # Convert to numpy array
-                img_array = np.array(image)
-                
-                # Calculate average brightness (0-255)
-                brightness = np.mean(img_array)
-                
-                # Calculate color temperature (red vs blue dominance)
-                red_channel = np.mean(img_array[:, :, 0])
-                blue_channel = np.mean(img_array[:, :, 2])
-                color_temp = red_channel - blue_channel  # Positive = warm, negative = cool
-                
-                # Calculate contrast (standard deviation of brightness)
-                contrast = np.std(img_array)
-                
-                # Calculate saturation (distance from gray)
-                gray = np.mean(img_array, axis=2)
-                saturation = np.mean(np.abs(img_array - gray[:, :, np.newaxis]))
+                # Brightness, color temperature, contrast and saturation from one compiled pass over the pixels
+                brightness, color_temp, contrast, saturation = _image_stats(img_array)
                 
                 # Combine factors for sentiment score
                 # Brightness: 0-255 -> -1 to 1 (dark = negative, bright = positive)
@@ -448,64 +616,111 @@ class BeatFormatterNoAI:
         Returns:
             Mood string based on BPM range
         """
-        if bpm <= 69:
-            return "Chill"
-        elif bpm <= 95:
-            return "R&B"
-        elif bpm <= 125:
-            return "Boom Bap"
-        else:
-            return "Trap"
+        return _MOOD_LABELS[bisect.bisect_left(_MOOD_THRESHOLDS, bpm)]
     
-    def extract_album_art(self, file_path: Path) -> Optional[str]:
+    def extract_album_art(self, file_path: Path) -> Optional[Tuple[bytes, str]]:
         """
-        Extract album art from MP3 file and convert to base64.
+        Extract the embedded album art from an MP3 file.
         
         Args:
             file_path: Path to the MP3 file
             
         Returns:
-            Base64 encoded album art data URL, or None if not found
+            Tuple of (image_bytes, mime_type), or None if not found
         """
         try:
-            # Try to load the file with mutagen
-            audio = File(str(file_path))
-            
-            if audio is None:
-                return None
-            
-            # Check if it has ID3 tags
-            if hasattr(audio, 'tags') and audio.tags:
-                # Look for APIC (album art) frames
-                for key in audio.tags.keys():
-                    if key.startswith('APIC:'):
-                        apic_data = audio.tags[key]
-                        if hasattr(apic_data, 'data'):
-                            # Convert to base64
-                            base64_data = base64.b64encode(apic_data.data).decode('utf-8')
-                            # Get MIME type
-                            mime_type = apic_data.mime or 'image/jpeg'
-                            # Return as data URL
-                            return f"data:{mime_type};base64,{base64_data}"
-            
-            # Alternative: try direct ID3 access
-            try:
-                id3 = ID3(str(file_path))
-                for key in id3.keys():
-                    if key.startswith('APIC:'):
-                        apic_data = id3[key]
-                        if hasattr(apic_data, 'data'):
-                            base64_data = base64.b64encode(apic_data.data).decode('utf-8')
-                            mime_type = apic_data.mime or 'image/jpeg'
-                            return f"data:{mime_type};base64,{base64_data}"
-            except Exception:
-                pass
+            # Open once with an explicit buffer and hand the same handle to both parsers
+            with open(file_path, 'rb', buffering=4096) as fh:
+                # Skip both mutagen parses when the ID3 tag has no picture frame
+                if self.id3_tag_has_picture(fh) is False:
+                    return None
+                fh.seek(0)
+                
+                # Try to load the file with mutagen
+                audio = File(fh)
+                
+                if audio is None:
+                    return None
+                
+                # Check if it has ID3 tags
+                if hasattr(audio, 'tags') and audio.tags:
+                    # Look for APIC (album art) frames
+                    for key in audio.tags.keys():
+                        if key.startswith('APIC:'):
+                            apic_data = audio.tags[key]
+                            if hasattr(apic_data, 'data'):
+                                return apic_data.data, apic_data.mime or 'image/jpeg'
+                
+                # Alternative: try direct ID3 access
+                try:
+                    fh.seek(0)
+                    id3 = ID3(fh)
+                    for key in id3.keys():
+                        if key.startswith('APIC:'):
+                            apic_data = id3[key]
+                            if hasattr(apic_data, 'data'):
+                                return apic_data.data, apic_data.mime or 'image/jpeg'
+                except Exception:
+                    pass
                 
         except Exception as e:
             logger.debug(f"Could not extract album art from {file_path.name}: {e}")
         
         return None
     
+    @staticmethod
+    def id3_tag_has_picture(fh) -> Optional[bool]:
+        """
+        Check for an attached-picture frame by scanning the raw ID3v2 tag bytes.
+        
+        Args:
+            fh: Binary file handle positioned at the start of the MP3
+            
+        Returns:
+            False if the file starts with an ID3v2 tag that contains no APIC (v2.3/2.4)
+            or PIC (v2.2) frame ID, True if one may be present, None if there is no
+            ID3v2 header to scan
+        """
+        header = fh.read(10)
+        if len(header) < 10 or header[:3] != b'ID3':
+            return None
+        
+        # Tag size is a 28-bit synchsafe integer (7 bits per byte)
+        size = (header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9]
+        tag = fh.read(size)
+        
+        frame_id = b'PIC' if header[3] == 2 else b'APIC'
+        return frame_id in tag
+    
+    def save_album_art(self, image_data: bytes, mime_type: str) -> str:
+        """
+        Write album art to beats/art/ under a content hash, so identical covers
+        are stored once and beats.json only carries a short relative path.
+        
+        Args:
+            image_data: Raw image bytes
+            mime_type: MIME type of the image
+            
+        Returns:
+            Relative path to the image file (e.g. "beats/art/1a2b3c4d5e6f7a8b.jpg")
+        """
+        digest = hashlib.sha1(image_data).hexdigest()[:16]
+        extension = mimetypes.guess_extension(mime_type) or '.jpg'
+        art_filename = f"{digest}{extension}"
+        
+        art_path = self.art_dir / art_filename
+        if not art_path.exists():
+            self.art_dir.mkdir(parents=True, exist_ok=True)
+            art_path.write_bytes(image_data)
+        
+        return f"beats/art/{art_filename}"
+    
+    def album_art_data_url(self, image_data: bytes, mime_type: str) -> str:
+        """Encode album art as a base64 data URL for inlining into beats.json."""
+        # Join as bytes and decode once, instead of decoding the base64 and then copying it into an f-string
+        prefix = f"data:{mime_type};base64,".encode('ascii')
+        return (prefix + base64.b64encode(image_data)).decode('ascii')
+    
     def rename_file(self, old_path: Path, new_filename: str) -> bool:
         """
         Rename a file to its sanitized name.
@@ -520,13 +735,22 @@ class BeatFormatterNoAI:
         try:
             new_path = old_path.parent / new_filename
             
-            # Check if target file already exists
-            if new_path.exists():
+            # Hard-link then unlink: fails atomically if the target exists, where
+            # Path.rename would silently overwrite it on POSIX
+            try:
+                os.link(old_path, new_path)
+            except FileExistsError:
                 logger.warning(f"Target file {new_filename} already exists, skipping rename")
                 return False
+            except OSError:
+                # Filesystem without hard link support: check, then rename
+                if new_path.exists():
+                    logger.warning(f"Target file {new_filename} already exists, skipping rename")
+                    return False
+                old_path.rename(new_path)
+            else:
+                old_path.unlink()
             
-            # Rename the file
-            old_path.rename(new_path)
             logger.info(f"Renamed: {old_path.name} -> {new_filename}")
             return True
             
@@ -534,13 +758,52 @@ class BeatFormatterNoAI:
             logger.error(f"Error renaming {old_path.name}: {e}")
             return False
     
-    def process_all_files(self, dry_run: bool = False) -> None:
+    def load_cache(self) -> Dict[str, Dict]:
+        """
+        Load cached per-file results from the cache file.
+        
+        Returns:
+            Dictionary mapping file path to {"key": "<version>:<size>:<mtime_ns>", "beat": beat_data}
+        """
+        if self.cache_file is None or not self.cache_file.exists():
+            return {}
+        
+        try:
+            return orjson.loads(self.cache_file.read_bytes())
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cache file {self.cache_file}: {e}")
+            return {}
+    
+    def save_cache(self, cache: Dict[str, Dict]) -> None:
+        """Write per-file results to the cache file."""
+        if self.cache_file is None:
+            return
+        
+        try:
+            self.cache_file.write_bytes(orjson.dumps(cache, option=orjson.OPT_SERIALIZE_NUMPY))
+            logger.info(f"Saved analysis cache for {len(cache)} files to {self.cache_file}")
+        except Exception as e:
+            logger.error(f"Error saving cache file: {e}")
+    
+    def cache_key(self, file_path: Path) -> str:
+        """
+        Cache validity key for a file: its size and modification time, plus the
+        options that change the stored record (album art inline vs beats/art path).
+        """
+        stat = file_path.stat()
+        art_mode = "inline" if self.inline_album_art else "files"
+        return f"{CACHE_VERSION}:{art_mode}:{stat.st_size}:{stat.st_mtime_ns}"
+    
+    def process_all_files(self, dry_run: bool = False, max_workers: Optional[int] = None) -> None:
         """
         Process all MP3 files in the beats directory.
         
         Args:
             dry_run: If True, don't actually rename files, just generate metadata
+            max_workers: Number of worker processes (defaults to the CPU count)
         """
+        self.generated_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        
         # Step 1: Scan for MP3 files
         mp3_files = self.scan_mp3_files()
         
@@ -548,49 +811,100 @@ class BeatFormatterNoAI:
             logger.warning("No MP3 files found in beats directory")
             return
         
-        # Step 2: Process each file
+        # Step 2: Reuse cached results for files whose size and mtime are unchanged
+        cache = self.load_cache()
+        cache_keys = {file_path: self.cache_key(file_path) for file_path in mp3_files}
+        cached_results = {}
         for file_path in mp3_files:
-            try:
-                # Process the file
-                beat_data = self.process_single_file(file_path)
-                
-                # Add to master list
-                self.beats_data.append(beat_data)
-                
-                # Step 3: Rename the file (unless dry run)
-                if not dry_run:
-                    success = self.rename_file(file_path, beat_data["newFileName"])
-                    if success:
-                        # Update the file path in our data
-                        beat_data["filePath"] = f"beats/{beat_data['newFileName']}"
-                
-            except Exception as e:
-                logger.error(f"Error processing {file_path.name}: {e}")
-                continue
+            entry = cache.get(str(file_path))
+            if entry and entry.get("key") == cache_keys[file_path]:
+                cached_results[file_path] = entry["beat"]
+        
+        logger.info(f"Reusing cached analysis for {len(cached_results)} files, "
+                    f"processing {len(mp3_files) - len(cached_results)}")
+        
+        # Step 3: Process the rest across worker processes (audio analysis is CPU-bound)
+        # Results are slotted by scan index, so output order is stable however workers finish
+        results = [cached_results.get(file_path) for file_path in mp3_files]
+        with ProcessPoolExecutor(
+            max_workers=max_workers or os.cpu_count(),
+            initializer=_init_worker,
+            initargs=(str(self.beats_dir), self.output_file, self.inline_album_art)
+        ) as executor:
+            futures = {
+                executor.submit(_process_file_in_worker, file_path): index
+                for index, file_path in enumerate(mp3_files)
+                if results[index] is None
+            }
+            
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    logger.error(f"Error processing {mp3_files[index].name}: {e}")
+        
+        # Add to master list, skipping files that failed
+        renames = [(file_path, beat_data) for file_path, beat_data in zip(mp3_files, results) if beat_data is not None]
+        self.beats_data.extend(beat_data for _, beat_data in renames)
+        
+        # Step 4: Rename the files in one pass in the main process (unless dry run)
+        new_cache = {}
+        for file_path, beat_data in renames:
+            if not dry_run:
+                success = self.rename_file(file_path, beat_data["newFileName"])
+                if success:
+                    # Update the file path in our data
+                    beat_data["filePath"] = f"beats/{beat_data['newFileName']}"
+                    file_path = file_path.parent / beat_data["newFileName"]
+            
+            # Renaming keeps size and mtime, so the key stays valid under the new path
+            new_cache[str(file_path)] = {"key": cache_keys.get(file_path) or self.cache_key(file_path), "beat": beat_data}
         
-        # Step 4: Save the JSON output
+        # Step 5: Save the JSON output and the analysis cache
         self.save_beats_json()
+        self.save_cache(new_cache)
         
         logger.info(f"Processing complete. Processed {len(self.beats_data)} files.")
     
     def save_beats_json(self) -> None:
         """Save the beats data to JSON file."""
         try:
-            output_data = {
-                "metadata": {
-                    "totalBeats": len(self.beats_data),
-                    "generatedAt": str(np.datetime64('now')),
-                    "version": "1.0",
-                    "processingMethod": "filename_analysis_and_audio_detection"
-                },
-                "beats": self.beats_data
+            metadata = {
+                "totalBeats": len(self.beats_data),
+                "generatedAt": self.generated_at,
+                "version": "1.0",
+                "waveformScale": WAVEFORM_SCALE,
+                "processingMethod": "filename_analysis_and_audio_detection"
             }
             
-            with open(self.output_file, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, indent=2, ensure_ascii=False)
+            # Write one beat record at a time so only a single record's bytes are buffered;
+            # numpy scalars (e.g. sentiment scores) pass through OPT_SERIALIZE_NUMPY
+            with open(self.output_file, 'wb') as f:
+                f.write(b'{\n  "metadata": ')
+                f.write(orjson.dumps(metadata))
+                f.write(b',\n  "beats": [')
+                for i, beat in enumerate(self.beats_data):
+                    f.write(b',\n    ' if i else b'\n    ')
+                    f.write(orjson.dumps(beat, option=orjson.OPT_SERIALIZE_NUMPY))
+                f.write(b'\n  ]\n}\n')
             
             logger.info(f"Saved beats data to {self.output_file}")
             
+            # Binary sibling: floats are stored as raw IEEE-754 instead of text
+            msgpack_file = Path(self.output_file).with_suffix('.msgpack')
+            packer = msgpack.Packer(use_bin_type=True)
+            with open(msgpack_file, 'wb') as f:
+                f.write(packer.pack_map_header(2))
+                f.write(packer.pack("metadata"))
+                f.write(packer.pack(metadata))
+                f.write(packer.pack("beats"))
+                f.write(packer.pack_array_header(len(self.beats_data)))
+                for beat in self.beats_data:
+                    f.write(packer.pack(beat))
+            
+            logger.info(f"Saved beats data to {msgpack_file}")
+            
         except Exception as e:
             logger.error(f"Error saving JSON file: {e}")
     
@@ -607,27 +921,50 @@ class BeatFormatterNoAI:
                     "file": beat["filePath"]
                 })
             
+            # Reuse the beats.json bytes save_beats_json already wrote instead of re-encoding the catalog
+            with open(self.output_file, 'rb') as f:
+                beats_json_bytes = f.read()
+            
             # Generate the JavaScript code
-            js_code = f"""// Auto-generated playlist from format_beats_no_ai.py
-// Generated on: {np.datetime64('now')}
+            js_header = f"""// Auto-generated playlist from format_beats_no_ai.py
+// Generated on: {self.generated_at}
 // Total beats: {len(self.beats_data)}
 // Processing method: Filename analysis and audio detection
 
-export const BEAT_PLAYLIST = {json.dumps(playlist_entries, indent=4)};
-
-// Individual beat metadata for advanced features
-export const BEAT_METADATA = {json.dumps(self.beats_data, indent=4)};
 """
             
             # Save to a new file
-            with open("js/generated_playlist.js", 'w', encoding='utf-8') as f:
-                f.write(js_code)
+            with open("js/generated_playlist.js", 'wb') as f:
+                f.write(js_header.encode('utf-8'))
+                f.write(b'export const BEAT_PLAYLIST = ')
+                f.write(orjson.dumps(playlist_entries, option=orjson.OPT_INDENT_2))
+                f.write(b';\n\n// Individual beat metadata for advanced features\n')
+                f.write(b'const BEAT_DATA = ')
+                f.write(beats_json_bytes)
+                f.write(b';\n\nexport const BEAT_METADATA = BEAT_DATA.beats;\n')
             
             logger.info("Generated js/generated_playlist.js for integration with beatManager.js")
             
         except Exception as e:
             logger.error(f"Error updating beat manager: {e}")
 
+# Per-process formatter used by ProcessPoolExecutor workers; built once per worker
+# by _init_worker so it isn't pickled per task
+_worker_formatter = None
+
+def _init_worker(beats_dir: str, output_file: str, inline_album_art: bool) -> None:
+    """Create this worker process's BeatFormatterNoAI."""
+    global _worker_formatter
+    _worker_formatter = BeatFormatterNoAI(
+        beats_dir=beats_dir,
+        output_file=output_file,
+        inline_album_art=inline_album_art
+    )
+
+def _process_file_in_worker(file_path: Path) -> Dict:
+    """Process a single file with this worker process's formatter."""
+    return _worker_formatter.process_single_file(file_path)
+
 def main():
     """Main function to run the beat formatter."""
     parser = argparse.ArgumentParser(description="Format beat files and extract metadata (No AI version)")
@@ -635,6 +972,10 @@ def main():
     parser.add_argument("--output", default="beats.json", help="Output JSON file")
     parser.add_argument("--dry-run", action="store_true", help="Don't rename files, just generate metadata")
     parser.add_argument("--update-beat-manager", action="store_true", help="Generate JavaScript playlist file")
+    parser.add_argument("--inline-album-art", action="store_true", help="Embed album art in beats.json as base64 data URLs instead of beats/art/ files")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (defaults to the CPU count)")
+    parser.add_argument("--cache-file", default=".beat_cache.json", help="JSON cache of per-file analysis results")
+    parser.add_argument("--no-cache", action="store_true", help="Re-analyze all files, ignoring the cache")
     
     args = parser.parse_args()
     
@@ -642,11 +983,13 @@ def main():
         # Initialize the formatter
         formatter = BeatFormatterNoAI(
             beats_dir=args.beats_dir,
-            output_file=args.output
+            output_file=args.output,
+            inline_album_art=args.inline_album_art,
+            cache_file=None if args.no_cache else args.cache_file
         )
         
         # Process all files
-        formatter.process_all_files(dry_run=args.dry_run)
+        formatter.process_all_files(dry_run=args.dry_run, max_workers=args.workers)
         
         # Update beat manager if requested
         if args.update_beat_manager:
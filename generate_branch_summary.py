@@ -1,4 +1,10 @@
+import argparse
 import datetime
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
 
 def prompt(section, multiline=False):
     print(f"\n{section}:")
@@ -14,9 +20,8 @@ def prompt(section, multiline=False):
     else:
         return input("> ")
 
-now = datetime.datetime.now().strftime("%Y-%m-%d")
-
-summary = f"""# Branch Summary
+def summary_from_prompts(now):
+    return f"""# Branch Summary
 
 ## Branch Name
 {prompt('Branch Name')}
@@ -45,7 +50,62 @@ summary = f"""# Branch Summary
 - **Summary Author:** {prompt('Summary Author')}
 """
 
+def summary_from_editor(now):
+    """Open $EDITOR on a template with every section, so the whole summary is filled in one session."""
+    template = f"""# Branch Summary
+
+## Branch Name
+
+
+## Goal / Purpose
+
+
+## Key Features / Changes
+
+
+## Files Created / Modified
+
+
+## Testing & Validation
+
+
+## Known Issues / Follow-ups
+
+
+## Next Steps
+
+
+## Reference
+- **Date Closed:** {now}
+- **Related PR/Issue:**
+- **Summary Author:**
+"""
+    with tempfile.NamedTemporaryFile("w", suffix=".md", delete=False, encoding="utf-8") as tmp:
+        tmp.write(template)
+
+    try:
+        editor = os.environ.get("VISUAL") or os.environ.get("EDITOR") or "vi"
+        result = subprocess.run(shlex.split(editor) + [tmp.name])
+        if result.returncode != 0:
+            sys.exit(f"Editor exited with status {result.returncode}; summary not saved")
+        with open(tmp.name, encoding="utf-8") as f:
+            return f.read()
+    finally:
+        os.unlink(tmp.name)
+
+parser = argparse.ArgumentParser(description="Write BRANCH_SUMMARY.md")
+parser.add_argument("--non-interactive", action="store_true",
+                    help="Answer one prompt per section instead of opening $EDITOR")
+args = parser.parse_args()
+
+now = datetime.datetime.now().strftime("%Y-%m-%d")
+
+if args.non_interactive:
+    summary = summary_from_prompts(now)
+else:
+    summary = summary_from_editor(now)
+
 with open("BRANCH_SUMMARY.md", "w", encoding="utf-8") as f:
     f.write(summary)
 
-print("\nBranch summary saved to BRANCH_SUMMARY.md")
\ No newline at end of file
+print("\nBranch summary saved to BRANCH_SUMMARY.md")
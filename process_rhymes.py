@@ -25,12 +25,11 @@ Usage:
     Requires:
     - Input file: 'random word list.txt' (one word per line)
     - Output file: 'rhyme_data.json' (created automatically)
-    - Dependencies: pronouncing, json, re, os
+    - Dependencies: pronouncing, orjson, os
 
 Dependencies:
     - pronouncing: CMU Pronouncing Dictionary interface
-    - json: JSON file I/O
-    - re: Regular expressions for phonetic pattern matching
+    - orjson: Fast JSON encoding for the streamed output file
     - os: File path operations
 
 Output Format:
@@ -47,15 +46,18 @@ with a warning count displayed during processing.
 """
 
 import pronouncing
-import json
-import re
+import orjson
 import os
+from multiprocessing import Pool
 
 # --- CONFIGURATION ---
 # Input word list file (assumed to be in the same directory as this script)
 WORD_LIST_FILE = 'random word list.txt'
 # Output JSON file (will be created/overwritten in the same directory)
 OUTPUT_JSON_FILE = 'rhyme_data.json'
+# Reuse entries already present in the output file instead of re-processing those words.
+# Set to False to rebuild every entry (e.g. after upgrading the pronouncing library).
+REUSE_EXISTING_OUTPUT = True
 
 # --- PATH DETERMINATION ---
 # Determine paths based on script location for reliable file access
@@ -63,104 +65,76 @@ SCRIPT_DIR = os.path.dirname(__file__)
 INPUT_PATH = os.path.join(SCRIPT_DIR, WORD_LIST_FILE)
 OUTPUT_PATH = os.path.join(SCRIPT_DIR, OUTPUT_JSON_FILE)
 
+# --- PHONETIC CONSTANTS ---
+# Arpabet vowel symbols used by the CMU dictionary
+_VOWELS = ('AA', 'AE', 'AH', 'AO', 'AW', 'AY', 'EH', 'ER', 'EY', 'IH', 'IY', 'OW', 'OY', 'UH', 'UW')
+# Every vowel phoneme, with or without its stress marker, mapped to the bare vowel;
+# consonants are absent, so one dict lookup both classifies and strips a phoneme
+_PHONE_TO_VOWEL = {vowel + stress: vowel for vowel in _VOWELS for stress in ('', '0', '1', '2')}
+
 
 # --- PHONETIC PROCESSING FUNCTIONS ---
 
-def get_all_phonemes(word):
+def build_pronunciation_lookup():
     """
-    Gets the complete phonetic representation of a word as an array of phonemes.
-    Uses the CMU Pronouncing Dictionary via the 'pronouncing' library.
-    Returns a list of all phonemes (e.g., ['IH', 'G', 'Z', 'AE', 'M', 'P', 'AH', 'L']) or None if not found.
+    Builds a dict mapping each lowercase CMU word to its first (most common) pronunciation.
     
-    Args:
-        word (str): The word to analyze
-        
     Returns:
-        list or None: List of all phonemes in order, or None if word not found
+        dict: word -> pronunciation string (e.g., 'IH0 G Z AE1 M P AH0 L')
         
     Note:
-        This function extracts ALL phonemes in sequence, including consonants and vowels,
-        which is crucial for advanced rhyme similarity scoring.
+        Older releases of 'pronouncing' scan the whole pronunciations list on every
+        phones_for_word() call. Building this dict once turns each lookup into a
+        single hash probe. Newer releases already keep a word -> pronunciations
+        dict in pronouncing.lookup, which is reused when available.
     """
-    # Ensure the word is lowercase for lookup, as CMUdict keys are often lowercase
-    word_lower = word.lower()
-    phones_list = pronouncing.phones_for_word(word_lower)
+    pronouncing.init_cmu()
 
-    if not phones_list:
-        return None  # Word not found in the dictionary
+    library_lookup = getattr(pronouncing, 'lookup', None)
+    if library_lookup:
+        return {word: phones[0] for word, phones in library_lookup.items() if phones}
 
-    # Use the first pronunciation found in the list (most common)
-    pronunciation = phones_list[0]
-    phonemes = pronunciation.split(' ')
+    lookup = {}
+    for word, phones in pronouncing.pronunciations:
+        lookup.setdefault(word, phones)  # First occurrence is the primary pronunciation
+    return lookup
 
-    # Return the list of phonemes if any were found, otherwise None
-    return phonemes if phonemes else None
 
-def get_all_vowel_pattern(word):
-    """
-    Finds the sequence of ALL vowel sounds for a word, regardless of stress.
-    Uses the CMU Pronouncing Dictionary via the 'pronouncing' library.
-    Returns a list of vowel phonemes (e.g., ['UW', 'IY']) or None if not found.
-    
-    Args:
-        word (str): The word to analyze
-        
-    Returns:
-        list or None: List of vowel phonemes in order, or None if word not found
-        
-    Note:
-        This function extracts ALL vowels in sequence, not just stressed ones,
-        which is crucial for comprehensive rhyme detection in freestyle rap.
-    """
-    # Ensure the word is lowercase for lookup, as CMUdict keys are often lowercase
-    word_lower = word.lower()
-    phones_list = pronouncing.phones_for_word(word_lower)
-
-    if not phones_list:
-        return None  # Word not found in the dictionary
+# --- PARALLEL WORKER HELPERS ---
+# Each worker process builds its own pronunciation lookup once in the pool initializer;
+# these live at module scope so they can be pickled for the worker processes.
 
-    # Use the first pronunciation found in the list (most common)
-    pronunciation = phones_list[0]
-    phonemes = pronunciation.split(' ')
+_worker_lookup = None
 
-    all_vowels = []
-    for phone in phonemes:
-        # Check if the phoneme starts with a standard English vowel character
-        # This regex matches Arpabet vowel symbols like AA, AE, AH, AO, etc.
-        if re.match(r'^[AEIOU]', phone):
-            # Extract the vowel part (remove any trailing stress number like 0, 1, or 2)
-            vowel = re.sub(r'[012]$', '', phone)
-            all_vowels.append(vowel)
+def _init_worker():
+    """Load the CMU dictionary into this worker process."""
+    global _worker_lookup
+    _worker_lookup = build_pronunciation_lookup()
 
-    # Return the list of vowels if any were found, otherwise None
-    return all_vowels if all_vowels else None
-
-
-def get_syllable_count(word):
+def _process_one(word):
     """
-    Gets the syllable count for a word using the pronouncing library.
-    Returns the syllable count as an integer, or None if the word is not found.
+    Derives the rhyme data entry for a single word in a worker process.
     
-    Args:
-        word (str): The word to count syllables for
-        
     Returns:
-        int or None: Number of syllables, or None if word not found
-        
-    Note:
-        Syllable counting is based on stressed phonemes (ending in 0, 1, or 2)
-        and is essential for rhythm training in freestyle rap.
+        tuple: (word, entry dict) or (word, None) if the word has no usable pronunciation
     """
-    word_lower = word.lower()
-    phones_list = pronouncing.phones_for_word(word_lower)
-    if not phones_list:
-        return None  # Word not found in dictionary
-
-    # Use the first pronunciation
-    pronunciation = phones_list[0]
-    # Count all phonemes that end with a digit (0, 1, or 2) - these indicate stress
-    syllable_count = len([ph for ph in pronunciation.split() if ph[-1].isdigit()])
-    return max(1, syllable_count)  # Ensure at least 1 syllable
+    # Look the word up once and derive every field from the same pronunciation,
+    # rather than having each helper repeat the dictionary lookup
+    pronunciation = _worker_lookup.get(word.lower())
+    if not pronunciation:
+        return word, None
+
+    phonemes = pronunciation.split()
+    pattern = [vowel for phone in phonemes if (vowel := _PHONE_TO_VOWEL.get(phone))]
+    if not pattern:
+        return word, None
+
+    syllable_count = max(1, sum(1 for ph in phonemes if ph[-1] in '012'))
+    return word, {
+        "rhyme_pattern": pattern,
+        "phonemes": phonemes,
+        "syllables": syllable_count
+    }
 
 
 # --- MAIN PROCESSING LOGIC ---
@@ -180,7 +154,6 @@ def process_word_list():
     The output JSON is structured for easy consumption by the web application's
     rhyme detection and syllable filtering features.
     """
-    rhyme_patterns = {}
     not_found_count = 0
     processed_count = 0
     word_count = 0
@@ -200,40 +173,78 @@ def process_word_list():
     # --- WORD LIST READING ---
     # Read words from the input file with error handling
     try:
-        with open(INPUT_PATH, 'r', encoding='utf-8') as f:
+        with open(INPUT_PATH, 'r', encoding='utf-8', buffering=1 << 20) as f:
             # Read lines, strip whitespace, filter out empty lines
-            words = [line.strip() for line in f if line.strip()]
+            # dict.fromkeys drops repeated words (keeping the first position), since entries
+            # are streamed to the output and a repeat would otherwise write a duplicate key
+            words = list(dict.fromkeys(line.strip() for line in f if line.strip()))
             word_count = len(words)
     except Exception as e:
         print(f"Error reading file '{INPUT_PATH}': {e}")
         return  # Stop execution if file cannot be read
 
-    print(f"Found {word_count} words/phrases in the list.")
-    print(f"Processing phonetic patterns and syllable counts (this may take a moment for large lists)...")
-
-    # --- WORD PROCESSING LOOP ---
-    # Process each word to extract phonetic data
-    for word in words:
-        # Get the vowel pattern using the helper function
-        pattern = get_all_vowel_pattern(word)
-        # Get the complete phoneme array
-        phonemes = get_all_phonemes(word)
-        # Get the syllable count
-        syllable_count = get_syllable_count(word)
-
-        if pattern and phonemes and syllable_count is not None:
-            # Store pattern, phonemes, and syllable count with the original (case preserved) word as the key
-            rhyme_patterns[word] = {
-                "rhyme_pattern": pattern,
-                "phonemes": phonemes,
-                "syllables": syllable_count
-            }
-            processed_count += 1
-        else:
-            # Word's pronunciation not found in the CMU dictionary
-            # Optionally print a warning for each missing word:
-            # print(f" - Warning: Phonetic data not found for '{word}'")
-            not_found_count += 1
+    print(f"Found {word_count} unique words/phrases in the list.")
+
+    # --- EXISTING OUTPUT REUSE ---
+    # Words already keyed in the previous output keep their entry, so re-running after
+    # adding words to the list only processes the new ones
+    existing = {}
+    if REUSE_EXISTING_OUTPUT and os.path.exists(OUTPUT_PATH):
+        try:
+            with open(OUTPUT_PATH, 'rb') as f:
+                existing = orjson.loads(f.read())
+        except Exception as e:
+            print(f"Could not reuse existing '{OUTPUT_PATH}', processing every word: {e}")
+            existing = {}
+    new_words = [word for word in words if word not in existing]
+    if existing:
+        print(f"Reusing {word_count - len(new_words)} entries from the existing output file.")
+
+    print(f"Processing phonetic patterns and syllable counts for {len(new_words)} words (this may take a moment for large lists)...")
+    print(f"Writing patterns to: {OUTPUT_PATH}")
+
+    # --- WORD PROCESSING AND JSON OUTPUT ---
+    # Each entry is written as soon as it is processed, so the full rhyme data never has
+    # to be held in memory. Output goes to a temporary file that replaces OUTPUT_PATH only
+    # once complete, leaving the previous rhyme data intact if processing fails.
+    temp_path = OUTPUT_PATH + '.tmp'
+    pool = None
+    try:
+        # Words are independent, so spread them across one worker per core.
+        # The pool is skipped entirely when every word was reused from the existing output.
+        pool = Pool(initializer=_init_worker) if new_words else None
+        with open(temp_path, 'wb') as f:
+            # imap (rather than imap_unordered) yields in new_words order, so the fresh
+            # results can be merged back into the word list order one at a time
+            fresh = pool.imap(_process_one, new_words, chunksize=512) if pool else iter(())
+            f.write(b'{')
+            for word in words:
+                entry = existing.get(word)
+                if entry is None:
+                    _, entry = next(fresh)
+                if entry:
+                    # Store pattern, phonemes, and syllable count with the original (case preserved) word as the key
+                    f.write(b',\n  ' if processed_count else b'\n  ')
+                    f.write(orjson.dumps(word))
+                    f.write(b': ')
+                    f.write(orjson.dumps(entry))
+                    processed_count += 1
+                else:
+                    # Word's pronunciation not found in the CMU dictionary
+                    # Optionally print a warning for each missing word:
+                    # print(f" - Warning: Phonetic data not found for '{word}'")
+                    not_found_count += 1
+            f.write(b'\n}\n')
+        os.replace(temp_path, OUTPUT_PATH)
+    except Exception as e:
+        print(f"--- ERROR ---")
+        print(f"Error writing JSON file '{OUTPUT_PATH}': {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return
+    finally:
+        if pool:
+            pool.terminate()
 
     # --- PROCESSING SUMMARY ---
     print(f"\n--- Processing Complete ---")
@@ -241,18 +252,7 @@ def process_word_list():
     if not_found_count > 0:
         print(f"Phonetic data not found for: {not_found_count} words (excluded from rhyme data)")
     print(f"Total words from list processed/attempted: {word_count}")
-
-    # --- JSON OUTPUT GENERATION ---
-    print(f"\nWriting {len(rhyme_patterns)} patterns to: {OUTPUT_PATH}")
-    try:
-        # Write the dictionary to a JSON file with pretty printing (indent=2)
-        with open(OUTPUT_PATH, 'w', encoding='utf-8') as f:
-            # ensure_ascii=False for wider character support (international words)
-            json.dump(rhyme_patterns, f, indent=2, ensure_ascii=False)
-        print("Successfully wrote JSON file.")
-    except Exception as e:
-        print(f"--- ERROR ---")
-        print(f"Error writing JSON file '{OUTPUT_PATH}': {e}")
+    print(f"Successfully wrote {processed_count} patterns to JSON file.")
 
 
 # --- SCRIPT EXECUTION ENTRY POINT ---
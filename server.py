@@ -4,11 +4,14 @@ Development HTTP Server for BaseFlowArena
 
 This module provides a simple HTTP server for local development of the BaseFlowArena
 application. It serves static files from the current directory and includes
-development-friendly features like cache prevention headers.
+development-friendly features like always-revalidate caching headers.
 
 Features:
 - Serves files from the script's directory
-- Prevents browser caching during development
+- Handles requests on separate threads so the browser's parallel asset loads
+  (scripts, styles, beats, rhyme data) don't queue behind each other
+- Revalidates cached files with ETag/Last-Modified so reloads get cheap 304s
+- Sends file bodies with zero-copy sendfile where the OS supports it
 - Configurable network access (localhost vs network)
 - Graceful shutdown on Ctrl+C
 - Security-focused defaults (localhost-only by default)
@@ -21,7 +24,7 @@ Usage:
     for development and testing.
 
 Dependencies:
-    - Python 3.x standard library (http.server, socketserver, os)
+    - Python 3.9+ standard library (http.server, os, stat)
     - No external dependencies required
 
 Security Notes:
@@ -31,8 +34,8 @@ Security Notes:
 """
 
 import http.server
-import socketserver
 import os
+import stat
 
 # --- SERVER CONFIGURATION ---
 PORT = 8000  # Standard development port
@@ -45,22 +48,75 @@ class Handler(http.server.SimpleHTTPRequestHandler):
     to add development-friendly headers and serve from a specific directory.
     """
     
+    # HTTP/1.1 keeps connections alive between requests; SimpleHTTPRequestHandler
+    # already sends Content-Length on every response, which keep-alive requires
+    protocol_version = 'HTTP/1.1'
+    
+    # Validator for the file being served by the current request (None otherwise)
+    etag = None
+    
     def __init__(self, *args, **kwargs):
         """Initialize handler with the specified directory."""
         super().__init__(*args, directory=DIRECTORY, **kwargs)
 
+    def send_head(self):
+        """
+        Override send_head to answer conditional GETs with 304 Not Modified.
+        Files get a weak ETag built from their mtime and size; if the browser's
+        If-None-Match already holds it, no body is sent. If-Modified-Since is
+        handled by SimpleHTTPRequestHandler itself via the Last-Modified header.
+        """
+        # Handler instances are reused across keep-alive requests, so reset per request
+        self.etag = None
+        try:
+            st = os.stat(self.translate_path(self.path))
+        except OSError:
+            st = None  # Let the base class produce the 404
+        if st is not None and stat.S_ISREG(st.st_mode):
+            self.etag = f'W/"{st.st_mtime_ns:x}-{st.st_size:x}"'
+            if_none_match = self.headers.get('If-None-Match')
+            if if_none_match:
+                # Weak comparison: ignore the W/ prefix on both sides
+                candidates = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+                if '*' in candidates or self.etag.removeprefix('W/') in candidates:
+                    self.send_response(304)
+                    self.end_headers()
+                    return None
+        return super().send_head()
+
     def end_headers(self):
         """
-        Override end_headers to add cache prevention headers.
-        This ensures fresh content during development by preventing
-        browser caching of static files.
+        Override end_headers to add revalidation headers.
+        This ensures fresh content during development: the browser may keep
+        a copy but must check it with the server before every use.
         """
-        # Add headers to prevent caching during development
-        self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate')
-        self.send_header('Pragma', 'no-cache')
-        self.send_header('Expires', '0')
+        # Cached copies must be revalidated (ETag / Last-Modified) on every load
+        self.send_header('Cache-Control', 'no-cache')
+        if self.etag:
+            self.send_header('ETag', self.etag)
         super().end_headers()
 
+    def copyfile(self, source, outputfile):
+        """
+        Override copyfile to send file bodies with socket.sendfile().
+        On Linux/macOS this uses os.sendfile(), so beat MP3s go straight from
+        the page cache to the socket without being copied through Python;
+        elsewhere (or for in-memory bodies) it falls back to a send() loop.
+        """
+        if outputfile is self.wfile:
+            self.wfile.flush()  # Headers must be on the wire before the body
+            self.connection.sendfile(source)
+        else:
+            super().copyfile(source, outputfile)
+
+# --- THREADED SERVER ---
+class DevServer(http.server.ThreadingHTTPServer):
+    """
+    Threaded HTTP server with a deeper listen backlog, so bursts of parallel
+    browser connections are queued instead of refused.
+    """
+    request_queue_size = 128
+
 # --- NETWORK CONFIGURATION ---
 # Ensure the server binds to localhost only for security unless specified otherwise
 # Use 0.0.0.0 to allow access from other devices on the network if needed,
@@ -69,8 +125,8 @@ ADDRESS = "localhost"  # Default: localhost only (secure)
 # ADDRESS = "0.0.0.0"  # Uncomment to allow network access (less secure)
 
 # --- SERVER INITIALIZATION ---
-# Create the TCP server with our custom handler
-httpd = socketserver.TCPServer((ADDRESS, PORT), Handler)
+# Create the threaded server with our custom handler
+httpd = DevServer((ADDRESS, PORT), Handler)
 
 # --- SERVER STARTUP ---
 print(f"Serving HTTP on http://{ADDRESS}:{PORT}/ from directory '{DIRECTORY}'...")
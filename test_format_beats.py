@@ -6,53 +6,22 @@ Run this before using the main script to ensure everything is set up correctly.
 
 import sys
 import os
+import importlib.util
 from pathlib import Path
 
 def test_imports():
-    """Test that all required modules can be imported."""
+    """Test that all required modules are installed."""
     print("Testing imports...")
     
-    try:
-        import openai
-        print("✓ openai imported successfully")
-    except ImportError as e:
-        print(f"✗ openai import failed: {e}")
-        return False
-    
-    try:
-        import librosa
-        print("✓ librosa imported successfully")
-    except ImportError as e:
-        print(f"✗ librosa import failed: {e}")
-        return False
-    
-    try:
-        import numpy as np
-        print("✓ numpy imported successfully")
-    except ImportError as e:
-        print(f"✗ numpy import failed: {e}")
-        return False
-    
-    try:
-        from pathlib import Path
-        print("✓ pathlib imported successfully")
-    except ImportError as e:
-        print(f"✗ pathlib import failed: {e}")
-        return False
-    
-    try:
-        import json
-        print("✓ json imported successfully")
-    except ImportError as e:
-        print(f"✗ json import failed: {e}")
-        return False
-    
-    try:
-        import re
-        print("✓ re imported successfully")
-    except ImportError as e:
-        print(f"✗ re import failed: {e}")
-        return False
+    # find_spec locates each module without executing it, so heavy packages like
+    # librosa (numba/llvmlite start-up) aren't loaded just to prove they exist;
+    # format_beats itself is really imported by test_format_beats_import
+    modules = ["openai", "librosa", "numpy", "soundfile", "orjson", "msgpack", "pathlib", "json", "re"]
+    for name in modules:
+        if importlib.util.find_spec(name) is None:
+            print(f"✗ {name} not found")
+            return False
+        print(f"✓ {name} found")
     
     return True
 
@@ -67,12 +36,14 @@ def test_beats_directory():
     
     print(f"✓ Beats directory found: {beats_dir}")
     
-    mp3_files = list(beats_dir.glob("*.mp3"))
-    if not mp3_files:
+    # Only the count is needed, so count DirEntry names without building Path objects
+    with os.scandir(beats_dir) as entries:
+        mp3_count = sum(1 for entry in entries if entry.name.endswith('.mp3') and entry.is_file(follow_symlinks=False))
+    if not mp3_count:
         print("✗ No MP3 files found in beats directory")
         return False
     
-    print(f"✓ Found {len(mp3_files)} MP3 files")
+    print(f"✓ Found {mp3_count} MP3 files")
     return True
 
 def test_format_beats_import():
@@ -117,6 +88,45 @@ def test_sample_processing():
         print(f"✗ Sample processing failed: {e}")
         return False
 
+def test_fast_filename_parsing():
+    """Test that only well-formed type-beat filenames skip the OpenAI call."""
+    print("\nTesting fast filename parsing...")
+    
+    try:
+        from format_beats import BeatFormatter
+        
+        formatter = BeatFormatter("test_key", "beats", "test_output.json")
+        
+        parsed = formatter._parse_filename_fast('[FREE] J. Cole Type Beat - "Sunday" (Prod. XYZ) 140BPM 2023.mp3')
+        if not parsed or parsed["trackTitle"] != "Sunday" or parsed["producer"] != "XYZ":
+            print(f"✗ Well-formed filename parsed incorrectly: {parsed}")
+            return False
+        parsed = formatter._parse_filename_fast('Drake Type Beat - Toronto (prod by Metro).mp3')
+        if not parsed or parsed["trackTitle"] != "Toronto" or parsed["producer"] != "Metro":
+            print(f"✗ 'prod by' filename parsed incorrectly: {parsed}")
+            return False
+        print("✓ Well-formed filenames parsed locally")
+        
+        # Names the pattern would mis-parse must be left for the API
+        ambiguous = [
+            "Drake Type Beat - Title | Hard Trap Instrumental 2023.mp3",
+            "Drake Type Beat - 2023.mp3",
+            "Drake Type Beat - Title 2023 Prod X.mp3",
+            "Drake Type Beat - Title - Free For Profit.mp3",
+            "Drake Type Beat - Title FFP.mp3",
+        ]
+        for name in ambiguous:
+            parsed = formatter._parse_filename_fast(name)
+            if parsed is not None:
+                print(f"✗ Ambiguous filename parsed locally: {name} -> {parsed['trackTitle']!r}")
+                return False
+        print(f"✓ {len(ambiguous)} ambiguous filenames left for OpenAI")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Fast filename parsing failed: {e}")
+        return False
+
 def main():
     """Run all tests."""
     print("Format Beats - Dependency and Setup Test")
@@ -126,7 +136,8 @@ def main():
         test_imports,
         test_beats_directory,
         test_format_beats_import,
-        test_sample_processing
+        test_sample_processing,
+        test_fast_filename_parsing
     ]
     
     passed = 0
@@ -6,49 +6,92 @@ Test script for image sentiment analysis
 import numpy as np
 from PIL import Image
 import base64
+import binascii
 import io
 
-def create_test_image(width=100, height=100, brightness=127, red_bias=0, contrast=30):
-    """Create a test image with specific characteristics"""
+try:
+    import simplejpeg  # libjpeg-turbo bindings, used by format_beats_no_ai when installed
+except ImportError:
+    simplejpeg = None
+
+# Shared generator for test image noise
+_RNG = np.random.default_rng()
+
+# Scratch arrays reused across calls, keyed by (name, shape, dtype)
+_SCRATCH = {}
+
+def _scratch(name, shape, dtype):
+    """Return a reusable uninitialized array; its contents are only valid until the next call"""
+    key = (name, shape, np.dtype(dtype))
+    buf = _SCRATCH.get(key)
+    if buf is None:
+        buf = _SCRATCH[key] = np.empty(shape, dtype)
+    return buf
+
+def create_test_image(width=100, height=100, brightness=127, red_bias=0, contrast=30, return_data_url=True):
+    """
+    Create a test image with specific characteristics.
+    
+    Returns (data_url, img_array); data_url is None when return_data_url is False,
+    which skips the JPEG encode for callers that analyze the array directly.
+    """
     
-    # Create base image
-    img_array = np.full((height, width, 3), brightness, dtype=np.uint8)
+    # Base pixel color: brightness with red vs blue bias, clipped per channel.
+    # The base image is uniform, so this 3-value pixel is broadcast below
+    # instead of building and adjusting a full-size array.
+    base_pixel = np.clip(
+        np.array([brightness + red_bias, brightness, brightness - red_bias], dtype=np.float32), 0, 255
+    )
     
-    # Add color bias (red vs blue)
-    img_array = img_array.astype(np.int16)  # Use int16 to handle negative values
-    img_array[:, :, 0] = np.clip(img_array[:, :, 0] + red_bias, 0, 255)  # Red channel
-    img_array[:, :, 2] = np.clip(img_array[:, :, 2] - red_bias, 0, 255)  # Blue channel
-    img_array = img_array.astype(np.uint8)  # Convert back to uint8
+    # Add contrast (Gaussian noise), built in place in a single float32 buffer
+    noise = _RNG.standard_normal(dtype=np.float32, out=_scratch('noise', (height, width, 3), np.float32))
+    noise *= contrast
+    noise += base_pixel
+    np.clip(noise, 0, 255, out=noise)
+    img_array = noise.astype(np.uint8)
     
-    # Add contrast (noise)
-    noise = np.random.normal(0, contrast, (height, width, 3))
-    img_array = np.clip(img_array + noise, 0, 255).astype(np.uint8)
+    if not return_data_url:
+        return None, img_array
     
-    # Convert to PIL Image
-    image = Image.fromarray(img_array)
+    # Encode as JPEG: straight from the array with simplejpeg, else via a PIL Image
+    if simplejpeg is not None:
+        img_data = simplejpeg.encode_jpeg(img_array, quality=75, colorspace='RGB')
+    else:
+        buffer = io.BytesIO()
+        Image.fromarray(img_array).save(buffer, format='JPEG')
+        img_data = buffer.getvalue()
     
     # Convert to base64 data URL
-    buffer = io.BytesIO()
-    image.save(buffer, format='JPEG')
-    img_data = buffer.getvalue()
-    base64_data = base64.b64encode(img_data).decode('utf-8')
+    base64_data = base64.b64encode(img_data).decode('ascii')
     data_url = f"data:image/jpeg;base64,{base64_data}"
     
     return data_url, img_array
 
-def analyze_image_sentiment(image_data_url: str):
-    """Analyze image sentiment based on brightness and color characteristics."""
+def analyze_image_sentiment(image_source):
+    """
+    Analyze image sentiment based on brightness and color characteristics.
+    
+    image_source is either a base64 image data URL or an already-decoded
+    RGB uint8 array at analysis size (100x100), which skips decoding.
+    """
     
     try:
-        # Extract base64 data from data URL
-        if image_data_url.startswith('data:'):
-            # Remove data URL prefix
-            base64_data = image_data_url.split(',')[1]
-            image_data = base64.b64decode(base64_data)
+        if isinstance(image_source, np.ndarray):
+            # Pixels are already decoded, so there is no JPEG/base64 round trip
+            img_array = image_source
+        elif image_source.startswith('data:'):
+            # Extract base64 data from data URL (remove data URL prefix).
+            # a2b_base64 reads an ASCII str in place, so the payload is not
+            # first re-encoded to bytes as base64.b64decode would
+            image_data = binascii.a2b_base64(image_source[image_source.index(',') + 1:])
             
             # Open image with PIL
             image = Image.open(io.BytesIO(image_data))
             
+            # Let the JPEG decoder scale down by 1/2, 1/4 or 1/8 while decoding (DCT scaling),
+            # so large album art is never fully decoded; a no-op for other formats
+            image.draft('RGB', (100, 100))
+            
             # Convert to RGB if necessary
             if image.mode != 'RGB':
                 image = image.convert('RGB')
@@ -58,60 +101,72 @@ def analyze_image_sentiment(image_data_url: str):
             
             # Convert to numpy array
             img_array = np.array(image)
-            
-            # Calculate average brightness (0-255)
-            brightness = np.mean(img_array)
-            
-            # Calculate color temperature (red vs blue dominance)
-            red_channel = np.mean(img_array[:, :, 0])
-            blue_channel = np.mean(img_array[:, :, 2])
-            color_temp = red_channel - blue_channel  # Positive = warm, negative = cool
-            
-            # Calculate contrast (standard deviation of brightness)
-            contrast = np.std(img_array)
-            
-            # Calculate saturation (distance from gray)
-            gray = np.mean(img_array, axis=2)
-            saturation = np.mean(np.abs(img_array - gray[:, :, np.newaxis]))
-            
-            # Combine factors for sentiment score
-            # Brightness: 0-255 -> -1 to 1 (dark = negative, bright = positive)
-            brightness_score = (brightness - 127.5) / 127.5
-            
-            # Color temperature: warm = positive, cool = negative
-            temp_score = np.clip(color_temp / 50, -1, 1)
-            
-            # Contrast: high contrast = intense/aggressive, low = calm
-            contrast_score = np.clip((contrast - 30) / 50, -1, 1)
-            
-            # Saturation: high saturation = energetic, low = mellow
-            saturation_score = np.clip((saturation - 30) / 50, -1, 1)
-            
-            # Weighted combination (brightness most important)
-            image_sentiment = (
-                brightness_score * 0.4 +
-                temp_score * 0.2 +
-                contrast_score * 0.2 +
-                saturation_score * 0.2
-            )
-            
-            # Convert to 1-10 scale
-            image_display = int(round((image_sentiment + 1) * 5))
-            image_display = max(1, min(10, image_display))
-            
-            return {
-                'brightness': brightness,
-                'color_temp': color_temp,
-                'contrast': contrast,
-                'saturation': saturation,
-                'brightness_score': brightness_score,
-                'temp_score': temp_score,
-                'contrast_score': contrast_score,
-                'saturation_score': saturation_score,
-                'sentiment': image_sentiment,
-                'display': image_display
-            }
-                
+        else:
+            return None
+        
+        # All statistics come from integer sums over the pixels (same as
+        # format_beats_no_ai._image_stats), with no float copies of the image
+        pixels = img_array.reshape(-1, 3)
+        n = pixels.shape[0]
+        flat = _scratch('flat', (n, 3), np.int32)
+        np.copyto(flat, pixels)
+        channel_sums = flat.sum(axis=0)
+        sum_sq = int(np.einsum('ij,ij->', flat, flat, dtype=np.int64))
+        total = int(channel_sums.sum())
+        
+        # Calculate average brightness (0-255)
+        brightness = total / (3 * n)
+        
+        # Calculate color temperature (red vs blue dominance)
+        color_temp = (int(channel_sums[0]) - int(channel_sums[2])) / n  # Positive = warm, negative = cool
+        
+        # Calculate contrast (standard deviation of brightness) from exact integer moments
+        contrast = float(np.sqrt((3 * n * sum_sq - total * total) / (3 * n) ** 2))
+        
+        # Calculate saturation (distance from gray) as mean |3 * value - pixel sum| / 3
+        deviation = np.multiply(flat, 3, out=_scratch('deviation', (n, 3), np.int32))
+        deviation -= flat.sum(axis=1, keepdims=True)
+        np.abs(deviation, out=deviation)
+        saturation = int(deviation.sum()) / (9 * n)
+        
+        # Combine factors for sentiment score
+        # Brightness: 0-255 -> -1 to 1 (dark = negative, bright = positive)
+        brightness_score = (brightness - 127.5) / 127.5
+        
+        # Color temperature: warm = positive, cool = negative
+        temp_score = np.clip(color_temp / 50, -1, 1)
+        
+        # Contrast: high contrast = intense/aggressive, low = calm
+        contrast_score = np.clip((contrast - 30) / 50, -1, 1)
+        
+        # Saturation: high saturation = energetic, low = mellow
+        saturation_score = np.clip((saturation - 30) / 50, -1, 1)
+        
+        # Weighted combination (brightness most important)
+        image_sentiment = (
+            brightness_score * 0.4 +
+            temp_score * 0.2 +
+            contrast_score * 0.2 +
+            saturation_score * 0.2
+        )
+        
+        # Convert to 1-10 scale
+        image_display = int(round((image_sentiment + 1) * 5))
+        image_display = max(1, min(10, image_display))
+        
+        return {
+            'brightness': brightness,
+            'color_temp': color_temp,
+            'contrast': contrast,
+            'saturation': saturation,
+            'brightness_score': brightness_score,
+            'temp_score': temp_score,
+            'contrast_score': contrast_score,
+            'saturation_score': saturation_score,
+            'sentiment': image_sentiment,
+            'display': image_display
+        }
+        
     except Exception as e:
         print(f"Error analyzing image: {e}")
         return None
@@ -138,15 +193,16 @@ def test_image_sentiment():
         print(f"\n{name}:")
         print(f"  Settings: Brightness={brightness}, Red Bias={red_bias}, Contrast={contrast}")
         
-        # Create test image
-        data_url, img_array = create_test_image(
+        # Create test image (pixels only; the JPEG path is covered once below)
+        _, img_array = create_test_image(
             brightness=brightness, 
             red_bias=red_bias, 
-            contrast=contrast
+            contrast=contrast,
+            return_data_url=False
         )
         
         # Analyze sentiment
-        result = analyze_image_sentiment(data_url)
+        result = analyze_image_sentiment(img_array)
         
         if result:
             print(f"  Brightness: {result['brightness']:.1f}")
@@ -169,5 +225,21 @@ def test_image_sentiment():
             
             print(f"  Mood: {mood}")
 
+def test_data_url_round_trip():
+    """Run one image through the full JPEG + base64 data URL path"""
+    
+    print("\nData URL Round Trip:")
+    data_url, img_array = create_test_image(brightness=127, red_bias=20, contrast=30)
+    from_url = analyze_image_sentiment(data_url)
+    from_array = analyze_image_sentiment(img_array)
+    
+    if from_url and from_array:
+        # JPEG is lossy, so the decoded image should only land close to the source pixels
+        print(f"  From data URL: {from_url['sentiment']:.3f} ({from_url['display']}/10)")
+        print(f"  From array:    {from_array['sentiment']:.3f} ({from_array['display']}/10)")
+    else:
+        print("  Analysis failed")
+
 if __name__ == "__main__":
-    test_image_sentiment() 
\ No newline at end of file
+    test_image_sentiment()
+    test_data_url_round_trip() 
\ No newline at end of file
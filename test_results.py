@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
-import json
+from collections import Counter
+from pathlib import Path
 
-# Load the beats data
-with open('beats.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+import orjson
+
+# Load the beats data (orjson parses the raw bytes directly, no text decode step)
+data = orjson.loads(Path('beats.json').read_bytes())
 
 print("🎵 Enhanced Beat Metadata Results")
 print("=" * 50)
@@ -32,12 +34,9 @@ print("🎯 Mood Distribution:")
 print("-" * 50)
 
 # Count moods
-mood_counts = {}
-for beat in data['beats']:
-    mood = beat.get('mood', 'Unknown')
-    mood_counts[mood] = mood_counts.get(mood, 0) + 1
+mood_counts = Counter(beat.get('mood', 'Unknown') for beat in data['beats'])
 
-for mood, count in sorted(mood_counts.items()):
+for mood, count in mood_counts.most_common():
     print(f"{mood}: {count} beats")
 
 print("\n🎵 Artist Type Beat Examples:")
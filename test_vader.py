@@ -3,11 +3,12 @@
 Test script for VADER sentiment analysis on beat filenames
 """
 
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-
 def test_vader_sentiment():
     """Test VADER sentiment analysis on sample beat filenames"""
     
+    # Imported here so importing this module stays cheap
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    
     # Initialize VADER analyzer
     analyzer = SentimentIntensityAnalyzer()
     
@@ -4,28 +4,41 @@ Comprehensive VADER sentiment analysis test on actual beat filenames
 """
 
 import os
+import functools
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 
-def get_enhanced_sentiment_score(analyzer, filename):
-    """Get enhanced sentiment score with more decisive classification"""
+# Emotional keywords used to break ties when VADER is neutral (substring matches)
+POSITIVE_KEYWORDS = frozenset(['hope', 'love', 'dream', 'heaven', 'peaceful', 'gentle', 'happy', 'joy', 'light', 'sun', 'morning', 'feelings'])
+NEGATIVE_KEYWORDS = frozenset(['sad', 'alone', 'dark', 'hell', 'angry', 'violent', 'hate', 'aggressive', 'hard', 'rough', 'night', 'evil', 'sinister', 'devious'])
+
+@functools.lru_cache(maxsize=1)
+def get_analyzer():
+    """Shared VADER analyzer; the package is imported and the lexicon loaded on first use"""
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    return SentimentIntensityAnalyzer()
+
+@functools.lru_cache(maxsize=None)
+def get_enhanced_sentiment_score(filename):
+    """Get enhanced sentiment score with more decisive classification (memoized per filename)"""
     
     # Get base VADER scores
-    scores = analyzer.polarity_scores(filename)
+    scores = get_analyzer().polarity_scores(filename)
     sentiment_score = scores['compound']  # -1 to 1
     
     # Make VADER more decisive by adjusting thresholds and adding bias
     # Instead of neutral 5/10 being the default, push toward stronger classifications
     if abs(sentiment_score) < 0.1:  # Very neutral scores
         # Look for emotional keywords to push toward stronger classification
-        emotional_keywords = {
-            'positive': ['hope', 'love', 'dream', 'heaven', 'peaceful', 'gentle', 'happy', 'joy', 'light', 'sun', 'morning', 'feelings'],
-            'negative': ['sad', 'alone', 'dark', 'hell', 'angry', 'violent', 'hate', 'aggressive', 'hard', 'rough', 'night', 'evil', 'sinister', 'devious']
-        }
-        
         filename_lower = filename.lower()
-        positive_count = sum(1 for word in emotional_keywords['positive'] if word in filename_lower)
-        negative_count = sum(1 for word in emotional_keywords['negative'] if word in filename_lower)
+        positive_count = 0
+        for word in POSITIVE_KEYWORDS:
+            if word in filename_lower:
+                positive_count += 1
+        negative_count = 0
+        for word in NEGATIVE_KEYWORDS:
+            if word in filename_lower:
+                negative_count += 1
         
         if positive_count > negative_count:
             sentiment_score = 0.3  # Push toward positive
@@ -60,25 +73,28 @@ def get_enhanced_sentiment_score(analyzer, filename):
     
     return sentiment_score, sentiment_display, scores
 
+def _score_one(filename):
+    """Score one filename in a worker process (each worker loads its own analyzer)"""
+    return (filename,) + get_enhanced_sentiment_score(filename)
+
 def test_all_beat_filenames():
     """Test VADER sentiment analysis on all actual beat filenames"""
     
-    # Initialize VADER analyzer
-    analyzer = SentimentIntensityAnalyzer()
-    
     # Get all MP3 files from beats directory
     beats_dir = Path("beats")
     if not beats_dir.exists():
         print("Beats directory not found!")
         return
     
-    mp3_files = list(beats_dir.glob("*.mp3"))
+    # Sorted MP3 names straight from the directory entries, without building Path objects
+    with os.scandir(beats_dir) as entries:
+        filenames = sorted(entry.name for entry in entries if entry.name.endswith('.mp3') and entry.is_file())
     
-    if not mp3_files:
+    if not filenames:
         print("No MP3 files found in beats directory!")
         return
     
-    print(f"VADER Sentiment Analysis Test - {len(mp3_files)} Beat Files")
+    print(f"VADER Sentiment Analysis Test - {len(filenames)} Beat Files")
     print("=" * 80)
     
     # Track sentiment ranges for summary
@@ -90,12 +106,12 @@ def test_all_beat_filenames():
         "Very Positive (8-10)": []
     }
     
-    for file_path in sorted(mp3_files):
-        filename = file_path.name
-        
-        # Get sentiment scores
-        sentiment_score, sentiment_display, scores = get_enhanced_sentiment_score(analyzer, filename)
-        
+    # Filenames are scored independently, so spread them across one worker per core;
+    # map() returns results in the sorted input order
+    with ProcessPoolExecutor() as executor:
+        results = list(executor.map(_score_one, filenames, chunksize=64))
+    
+    for filename, sentiment_score, sentiment_display, scores in results:
         # Categorize for summary
         if sentiment_display <= 2:
             category = "Very Negative (1-2)"
@@ -111,7 +127,8 @@ def test_all_beat_filenames():
         sentiment_ranges[category].append(filename)
         
         # Show detailed analysis for interesting cases
-        if sentiment_display != 5 or "sad" in filename.lower() or "happy" in filename.lower() or "dark" in filename.lower():
+        filename_lower = filename.lower()
+        if sentiment_display != 5 or "sad" in filename_lower or "happy" in filename_lower or "dark" in filename_lower:
             print(f"\n📁 {filename}")
             print(f"   Raw Score: {sentiment_score:.3f} | Display: {sentiment_display}/10")
             print(f"   Sentiment: {scores}")
@@ -122,7 +139,7 @@ def test_all_beat_filenames():
     print("SENTIMENT DISTRIBUTION SUMMARY")
     print("=" * 80)
     
-    total_files = len(mp3_files)
+    total_files = len(filenames)
     for category, files in sentiment_ranges.items():
         count = len(files)
         percentage = (count / total_files) * 100
@@ -140,8 +157,6 @@ def test_all_beat_filenames():
 def analyze_specific_keywords():
     """Analyze how VADER interprets common beat title keywords"""
     
-    analyzer = SentimentIntensityAnalyzer()
-    
     keywords = [
         "sad", "happy", "dark", "light", "aggressive", "chill", "emotional",
         "hope", "alone", "feelings", "love", "hate", "dream", "nightmare",
@@ -154,7 +169,7 @@ def analyze_specific_keywords():
     print("=" * 80)
     
     for keyword in keywords:
-        sentiment_score, sentiment_display, scores = get_enhanced_sentiment_score(analyzer, keyword)
+        sentiment_score, sentiment_display, scores = get_enhanced_sentiment_score(keyword)
         
         print(f"{keyword:12} | Raw: {sentiment_score:6.3f} | Display: {sentiment_display}/10 | {scores}")
 